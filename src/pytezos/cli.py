@@ -2,8 +2,11 @@ import fire
 from os.path import abspath
 from glob import glob
 from pprint import pprint
+from tqdm import tqdm
 
 from pytezos import pytezos, Contract, RpcError
+from pytezos.rpc import ShellQuery, RpcNode
+from pytezos.rpc.diskcache import DiskCache, default_path
 from pytezos.operation.result import OperationResult
 from pytezos.michelson.docstring import generate_docstring
 from pytezos.tools.github import create_deployment, create_deployment_status
@@ -146,6 +149,35 @@ class PyTezosCli:
                                                   environment_url=bcd_link)
                 pprint(status)
 
+    def cache(self, action, network='mainnet', start=None, stop=None, path=default_path, max_size=None):
+        """
+        Manage persistent cache of immutable RPC responses
+        :param action: One of `warm`, `inspect`, `prune`
+        :param network: Network to download blocks from (warm only), default is Mainnet
+        :param start: First block level to download (warm only), can be negative
+        :param stop: Last block level to download (warm only), default is head
+        :param path: Path to the cache database, default is ~/.pytezos/rpc_cache.sqlite
+        :param max_size: Size limit in bytes (prune only), default is the cache limit
+        """
+        disk_cache = DiskCache(path=path)
+        if action == 'warm':
+            assert start is not None, 'Start level is required'
+            node = pytezos.using(shell=network).shell.node
+            shell = ShellQuery(node=RpcNode(uri=node.uri, network=network, disk_cache=disk_cache))
+            block_hashes = shell.blocks[start:stop]()[0]
+            for block_hash in tqdm(block_hashes):
+                shell.blocks[block_hash]()
+                shell.blocks[block_hash].operation_hashes()
+            pprint(disk_cache.stats())
+        elif action == 'inspect':
+            print(disk_cache)
+        elif action == 'prune':
+            deleted = disk_cache.prune(max_size=max_size, vacuum=True)
+            print(f'{deleted} entries deleted')
+            pprint(disk_cache.stats())
+        else:
+            assert False, action
+
 
 def main():
     return fire.Fire(PyTezosCli)
@@ -3,6 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from pytezos.operation.group import OperationGroup
+from pytezos.operation.batch import BatchBuilder
 from pytezos.operation.content import ContentMixin
 from pytezos.michelson.interface import ContractInterface
 from pytezos.michelson.contract import Contract
@@ -58,6 +59,20 @@ class PyTezosClient(Interop, ContentMixin):
             key=self.key
         )
 
+    def batch(self, contents=None, **kwargs) -> BatchBuilder:
+        """
+        Create a builder which packs many operations into as few operation groups as possible.
+        :param contents: List of operation contents or groups (optional), can be added later
+        :param kwargs: Group limits, see `BatchBuilder`
+        :return: BatchBuilder
+        """
+        return BatchBuilder(
+            contents=contents,
+            shell=self.shell,
+            key=self.key,
+            **kwargs
+        )
+
     def account(self, account_id=None) -> dict:
         """
         Shortcut for RPC contract request
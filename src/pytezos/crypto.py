@@ -1,17 +1,9 @@
 import hashlib
-import pysodium
-import secp256k1
 import binascii
 import json
 from os.path import expanduser, join, abspath
 from getpass import getpass
-from fastecdsa.ecdsa import sign, verify
-from fastecdsa.keys import get_public_key
-from fastecdsa.curve import P256
-from fastecdsa.encoding.util import int_to_bytes, bytes_to_int
-from fastecdsa.encoding.sec1 import SEC1Encoder
 from pyblake2 import blake2b
-from mnemonic import Mnemonic
 
 from pytezos.encoding import scrub_input, base58_decode, base58_encode
 from pytezos.tools.docstring import InlineDocstring, get_class_docstring
@@ -22,6 +14,7 @@ def blake2b_32(v=b''):
 
 
 def validate_mnemonic(mnemonic, language='english'):
+    from mnemonic import Mnemonic
     m = Mnemonic(language)
     mnemonic = m.normalize_string(mnemonic).split(' ')
     if len(mnemonic) not in [12, 15, 18, 21, 24]:
@@ -74,6 +67,7 @@ class Key(metaclass=InlineDocstring):
         """
         # Ed25519
         if curve == b'ed':
+            import pysodium
             # Dealing with secret exponent or seed?
             if len(secret_exponent) == 64:
                 public_point = pysodium.crypto_sign_sk_to_pk(sk=secret_exponent)
@@ -81,10 +75,15 @@ class Key(metaclass=InlineDocstring):
                 public_point, secret_exponent = pysodium.crypto_sign_seed_keypair(seed=secret_exponent)
         # Secp256k1
         elif curve == b'sp':
+            import secp256k1
             sk = secp256k1.PrivateKey(secret_exponent)
             public_point = sk.pubkey.serialize()
         # P256
         elif curve == b'p2':
+            from fastecdsa.keys import get_public_key
+            from fastecdsa.curve import P256
+            from fastecdsa.encoding.util import bytes_to_int
+            from fastecdsa.encoding.sec1 import SEC1Encoder
             pk = get_public_key(bytes_to_int(secret_exponent), curve=P256)
             public_point = SEC1Encoder.encode_public_key(pk)
         else:
@@ -138,6 +137,7 @@ class Key(metaclass=InlineDocstring):
                 iterations=32768,
                 dklen=32
             )
+            import pysodium
             key = pysodium.crypto_secretbox_open(
                 c=encrypted_sk, nonce=b'\000' * 24, k=encryption_key)
             del passphrase
@@ -155,6 +155,7 @@ class Key(metaclass=InlineDocstring):
         :param export: export as json file in the current folder, default is True
         :return: Key
         """
+        from mnemonic import Mnemonic
         mnemonic = Mnemonic(language).generate(strength)
         key = cls.from_mnemonic(mnemonic, passphrase, curve=curve)
 
@@ -187,9 +188,11 @@ class Key(metaclass=InlineDocstring):
         if validate:
             validate_mnemonic(mnemonic)
 
+        from mnemonic import Mnemonic
         seed = Mnemonic.to_seed(mnemonic, passphrase=email + passphrase)
 
         if curve == b'ed':
+            import pysodium
             _, secret_exponent = pysodium.crypto_sign_seed_keypair(seed=seed[:32])
         elif curve == b'sp':
             secret_exponent = seed[:32]
@@ -264,6 +267,8 @@ class Key(metaclass=InlineDocstring):
         if not self.secret_exponent:
             raise ValueError("Secret key not known.")
 
+        import pysodium
+
         if self.curve == b'ed' and ed25519_seed:
             key = pysodium.crypto_sign_sk_to_seed(self.secret_exponent)
         else:
@@ -313,15 +318,19 @@ class Key(metaclass=InlineDocstring):
 
         # Ed25519
         if self.curve == b"ed":
+            import pysodium
             digest = pysodium.crypto_generichash(message)
             signature = pysodium.crypto_sign_detached(digest, self.secret_exponent)
         # Secp256k1
         elif self.curve == b"sp":
+            import secp256k1
             pk = secp256k1.PrivateKey(self.secret_exponent)
             signature = pk.ecdsa_serialize_compact(
                 pk.ecdsa_sign(message, digest=blake2b_32))
         # P256
         elif self.curve == b"p2":
+            from fastecdsa.ecdsa import sign
+            from fastecdsa.encoding.util import int_to_bytes, bytes_to_int
             r, s = sign(msg=message, d=bytes_to_int(self.secret_exponent), hashfunc=blake2b_32)
             signature = int_to_bytes(r) + int_to_bytes(s)
         else:
@@ -354,6 +363,7 @@ class Key(metaclass=InlineDocstring):
 
         # Ed25519
         if self.curve == b"ed":
+            import pysodium
             digest = pysodium.crypto_generichash(message)
             try:
                 pysodium.crypto_sign_verify_detached(signature, digest, self.public_point)
@@ -361,12 +371,17 @@ class Key(metaclass=InlineDocstring):
                 raise ValueError('Signature is invalid.')
         # Secp256k1
         elif self.curve == b"sp":
+            import secp256k1
             pk = secp256k1.PublicKey(self.public_point, raw=True)
             sig = pk.ecdsa_deserialize_compact(signature)
             if not pk.ecdsa_verify(message, sig, digest=blake2b_32):
                 raise ValueError('Signature is invalid.')
         # P256
         elif self.curve == b"p2":
+            from fastecdsa.ecdsa import verify
+            from fastecdsa.curve import P256
+            from fastecdsa.encoding.util import bytes_to_int
+            from fastecdsa.encoding.sec1 import SEC1Encoder
             pk = SEC1Encoder.decode_public_key(self.public_point, curve=P256)
             r, s = bytes_to_int(signature[:32]), bytes_to_int(signature[32:])
             if not verify(sig=(r, s), msg=message, Q=pk, hashfunc=blake2b_32):
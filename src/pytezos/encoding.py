@@ -14,6 +14,7 @@ base58_encodings = [
     (b"LLo",   53,   tb([29, 159, 109]),           32,   u"operation list list hash"),
     (b"P",     51,   tb([2, 170]),                 32,   u"protocol hash"),
     (b"Co",    52,   tb([79, 199]),                32,   u"context hash"),
+    (b"nce",   53,   tb([69, 220, 169]),           32,   u"nonce hash"),
 
     (b"tz1",   36,   tb([6, 161, 159]),            20,   u"ed25519 public key hash"),
     (b"tz2",   36,   tb([6, 161, 161]),            20,   u"secp256k1 public key hash"),
@@ -264,3 +265,230 @@ def forge_array(data, len_bytes=4) -> bytes:
 
 def forge_base58(value) -> bytes:
     return base58_decode(value.encode())
+
+
+class BinaryWriter:
+    """
+    Growable buffer all the forgers write to: values are appended in place, length prefixes are back-patched.
+    """
+    __slots__ = ('buffer',)
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
+
+    def write(self, data):
+        self.buffer += data
+
+    def write_byte(self, value: int):
+        self.buffer.append(value)
+
+    def write_nat(self, value: int):
+        """
+        Append a number encoded with LEB128 (Zarith)
+        """
+        if value < 0:
+            raise ValueError('Value cannot be negative.')
+
+        while True:
+            byte = value & 0x7f
+            value >>= 7
+            if value:
+                self.buffer.append(byte | 0x80)
+            else:
+                self.buffer.append(byte)
+                break
+
+    def write_int_fixed(self, value: int, length: int):
+        self.buffer += int(value).to_bytes(length, 'big')
+
+    def write_bool(self, value):
+        self.buffer.append(0xff if value else 0x00)
+
+    def write_base58(self, value):
+        self.buffer += forge_base58(value)
+
+    def write_address(self, value, tz_only=False):
+        self.buffer += forge_address(value, tz_only=tz_only)
+
+    def write_public_key(self, value):
+        self.buffer += forge_public_key(value)
+
+    def write_array(self, data, len_bytes=4):
+        self.buffer += len(data).to_bytes(len_bytes, 'big')
+        self.buffer += data
+
+    def begin_array(self, len_bytes=4) -> int:
+        """
+        Reserve space for the length prefix of data that is going to be written next.
+        :return: Position to pass to `end_array`
+        """
+        self.buffer += bytes(len_bytes)
+        return len(self.buffer)
+
+    def end_array(self, position: int, len_bytes=4):
+        """
+        Write the length of data written since `begin_array`.
+        """
+        self.buffer[position - len_bytes:position] = (len(self.buffer) - position).to_bytes(len_bytes, 'big')
+
+
+class SizeCounter(BinaryWriter):
+    """
+    Writer that only counts bytes: base58 values are not decoded, so it is much cheaper than forging.
+    """
+    __slots__ = ('size',)
+
+    def __init__(self):
+        super(SizeCounter, self).__init__()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def getvalue(self) -> bytes:
+        raise NotImplementedError('Size counter does not keep data')
+
+    def write(self, data):
+        self.size += len(data)
+
+    def write_byte(self, value: int):
+        self.size += 1
+
+    def write_nat(self, value: int):
+        if value < 0:
+            raise ValueError('Value cannot be negative.')
+        self.size += max(1, (value.bit_length() + 6) // 7)
+
+    def write_int_fixed(self, value: int, length: int):
+        self.size += length
+
+    def write_bool(self, value):
+        self.size += 1
+
+    def write_base58(self, value):
+        self.size += next(
+            encoding[3]
+            for encoding in base58_encodings
+            if len(value) == encoding[1] and value.startswith(encoding[0].decode())
+        )
+
+    def write_address(self, value, tz_only=False):
+        self.size += 21 if tz_only else 22
+
+    def write_public_key(self, value):
+        self.size += 33 if value.startswith('edpk') else 34
+
+    def write_array(self, data, len_bytes=4):
+        self.size += len_bytes + len(data)
+
+    def begin_array(self, len_bytes=4) -> int:
+        self.size += len_bytes
+        return self.size
+
+    def end_array(self, position: int, len_bytes=4):
+        pass
+
+
+class BinaryReader:
+    """
+    Sequential reader over a memoryview: nothing is copied until a value is decoded.
+    """
+    __slots__ = ('data', 'pos', 'end')
+
+    def __init__(self, data, pos=0, end=None):
+        """
+        :param data: bytes, bytearray, or memoryview
+        :param pos: Start offset
+        :param end: End offset (exclusive), default is the end of data
+        """
+        self.data = data if isinstance(data, memoryview) else memoryview(data)
+        self.pos = pos
+        self.end = len(self.data) if end is None else end
+
+    def at_end(self) -> bool:
+        return self.pos >= self.end
+
+    def remaining(self) -> int:
+        return self.end - self.pos
+
+    def read(self, size) -> memoryview:
+        if self.pos + size > self.end:
+            raise ValueError(f'Unexpected end of data at {self.pos}, {size} bytes expected')
+        res = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return res
+
+    def read_all(self) -> memoryview:
+        return self.read(self.end - self.pos)
+
+    def read_byte(self) -> int:
+        if self.pos >= self.end:
+            raise ValueError(f'Unexpected end of data at {self.pos}')
+        res = self.data[self.pos]
+        self.pos += 1
+        return res
+
+    def read_array(self, len_bytes=4) -> 'BinaryReader':
+        """
+        Read length-prefixed data.
+        :param len_bytes: Size of the length prefix
+        :return: BinaryReader limited to the array contents
+        """
+        size = int.from_bytes(self.read(len_bytes), 'big')
+        res = BinaryReader(self.data, self.pos, self.pos + size)
+        self.read(size)
+        return res
+
+
+def unforge_nat(reader: BinaryReader) -> int:
+    """
+    Decode a number encoded with LEB128 (Zarith)
+    :param reader: BinaryReader
+    :return: int
+    """
+    value, shift = 0, 0
+    while True:
+        byte = reader.read_byte()
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value
+
+
+def unforge_bool(reader: BinaryReader) -> bool:
+    return reader.read_byte() == 0xff
+
+
+def unforge_base58(reader: BinaryReader, prefix: bytes) -> str:
+    size = next(encoding[3] for encoding in base58_encodings if encoding[0] == prefix)
+    return base58_encode(bytes(reader.read(size)), prefix).decode()
+
+
+def unforge_public_key(reader: BinaryReader) -> str:
+    key_prefix = {
+        0: (b'edpk', 32),
+        1: (b'sppk', 33),
+        2: (b'p2pk', 33)
+    }
+    prefix, size = key_prefix[reader.read_byte()]
+    return base58_encode(bytes(reader.read(size)), prefix).decode()
+
+
+def unforge_address(reader: BinaryReader, tz_only=False) -> str:
+    tz_prefixes = {
+        0: b'tz1',
+        1: b'tz2',
+        2: b'tz3'
+    }
+    if not tz_only and reader.read_byte() == 1:
+        res = base58_encode(bytes(reader.read(20)), b'KT1').decode()
+        reader.read(1)  # padding
+        return res
+    prefix = tz_prefixes[reader.read_byte()]
+    return base58_encode(bytes(reader.read(20)), prefix).decode()
@@ -2,6 +2,8 @@
 
 from ply.lex import Lexer, lex
 from ply.yacc import yacc
+from os.path import dirname
+from inspect import cleandoc
 import re
 
 # Inspired by https://github.com/jansorg/tezos-intellij/blob/master/grammar/michelson.bnf
@@ -132,12 +134,24 @@ class MichelineParser(object):
         '''empty :'''
 
     def __init__(self, debug=False, write_tables=False):
+        """
+        :param debug: Write grammar debug info (parser.out)
+        :param write_tables: Regenerate precomputed LALR tables (parsetab.py), required after grammar changes
+        """
         self.lexer = SimpleMichelsonLexer()
         self.parser = yacc(
             module=self,
             debug=debug,
             write_tables=write_tables,
+            tabmodule='pytezos.micheline.parsetab',
+            outputdir=dirname(__file__)
         )
 
     def parse(self, code):
         return self.parser.parse(code)
+
+
+# PLY matches the shipped tables by a signature of the rule docstrings, which Python 3.13+ dedents on compile
+for name, rule in vars(MichelineParser).items():
+    if name.startswith('p_') and rule.__doc__:
+        rule.__doc__ = cleandoc(rule.__doc__)
@@ -1,4 +1,4 @@
-from pytezos.encoding import forge_array
+from pytezos.encoding import forge_array, BinaryReader, BinaryWriter
 
 prim_tags = {
     'parameter': b'\x00',
@@ -149,6 +149,10 @@ reserved_entries = {
 }
 
 
+prim_names = {tag[0]: prim for prim, tag in prim_tags.items()}
+reserved_names = {tag[0]: entrypoint for entrypoint, tag in reserved_entries.items()}
+
+
 def forge_int(value: int):
     res = bytearray()
     i = abs(value)
@@ -171,53 +175,137 @@ def forge_entrypoint(entrypoint):
         return b'\xff' + forge_array(entrypoint.encode(), len_bytes=1)
 
 
-def forge_micheline(data):
-    res = []
-
+def write_micheline(writer: BinaryWriter, data):
     if isinstance(data, list):
-        res.append(b'\x02')
-        res.append(forge_array(b''.join(map(forge_micheline, data))))
+        writer.write_byte(0x02)
+        position = writer.begin_array()
+        for item in data:
+            write_micheline(writer, item)
+        writer.end_array(position)
 
     elif isinstance(data, dict):
         if data.get('prim'):
             args_len = len(data.get('args', []))
             annots_len = len(data.get('annots', []))
 
-            res.append(len_tags[args_len][annots_len > 0])
-            res.append(prim_tags[data['prim']])
+            writer.write(len_tags[args_len][annots_len > 0])
+            writer.write(prim_tags[data['prim']])
 
             if args_len > 0:
-                args = b''.join(map(forge_micheline, data['args']))
-                if args_len < 3:
-                    res.append(args)
-                else:
-                    res.append(forge_array(args))
+                position = writer.begin_array() if args_len >= 3 else None
+                for arg in data['args']:
+                    write_micheline(writer, arg)
+                if position is not None:
+                    writer.end_array(position)
 
             if annots_len > 0:
-                res.append(forge_array(' '.join(data['annots']).encode()))
+                writer.write_array(' '.join(data['annots']).encode())
             elif args_len == 3:
-                res.append(b'\x00' * 4)
+                writer.write(b'\x00' * 4)
 
         elif data.get('bytes') is not None:
-            res.append(b'\x0A')
-            res.append(forge_array(bytes.fromhex(data['bytes'])))
+            writer.write_byte(0x0A)
+            writer.write_array(bytes.fromhex(data['bytes']))
 
         elif data.get('int') is not None:
-            res.append(b'\x00')
-            res.append(forge_int(int(data['int'])))
+            writer.write_byte(0x00)
+            writer.write(forge_int(int(data['int'])))
 
         elif data.get('string') is not None:
-            res.append(b'\x01')
-            res.append(forge_array(data['string'].encode()))
+            writer.write_byte(0x01)
+            writer.write_array(data['string'].encode())
         else:
             assert False, data
     else:
         assert False, data
 
-    return b''.join(res)
+
+def write_script(writer: BinaryWriter, script):
+    for section in ['code', 'storage']:
+        position = writer.begin_array()
+        write_micheline(writer, script[section])
+        writer.end_array(position)
+
+
+def forge_micheline(data) -> bytes:
+    writer = BinaryWriter()
+    write_micheline(writer, data)
+    return writer.getvalue()
+
+
+def forge_script(script) -> bytes:
+    writer = BinaryWriter()
+    write_script(writer, script)
+    return writer.getvalue()
+
+
+def unforge_int(reader: BinaryReader) -> int:
+    byte = reader.read_byte()
+    value, shift, negative = byte & 0b00111111, 6, byte & 0b01000000
+    while byte & 0b10000000:
+        byte = reader.read_byte()
+        value |= (byte & 0b01111111) << shift
+        shift += 7
+    return -value if negative else value
 
 
-def forge_script(script):
-    code = forge_micheline(script['code'])
-    storage = forge_micheline(script['storage'])
-    return forge_array(code) + forge_array(storage)
+def unforge_entrypoint(reader: BinaryReader) -> str:
+    tag = reader.read_byte()
+    if tag == 0xff:
+        return str(reader.read_array(len_bytes=1).read_all(), 'utf-8')
+    return reserved_names[tag]
+
+
+def unforge_micheline(data):
+    """
+    Decode binary Micheline expression (without the `05` prefix of packed data).
+    :param data: bytes or BinaryReader
+    :return: Micheline expression (JSON)
+    """
+    reader = data if isinstance(data, BinaryReader) else BinaryReader(data)
+    tag = reader.read_byte()
+
+    if tag == 0x00:
+        return {'int': str(unforge_int(reader))}
+    elif tag == 0x01:
+        return {'string': str(reader.read_array().read_all(), 'utf-8')}
+    elif tag == 0x02:
+        items = reader.read_array()
+        res = []
+        while not items.at_end():
+            res.append(unforge_micheline(items))
+        return res
+    elif tag == 0x0A:
+        return {'bytes': reader.read_array().read_all().hex()}
+    elif 0x03 <= tag <= 0x09:
+        res = {'prim': prim_names[reader.read_byte()]}
+        if tag == 0x09:
+            items = reader.read_array()
+            args = []
+            while not items.at_end():
+                args.append(unforge_micheline(items))
+        else:
+            args = [unforge_micheline(reader) for _ in range((tag - 0x03) // 2)]
+        if args:
+            res['args'] = args
+
+        if tag == 0x09 or tag % 2 == 0:
+            annots = str(reader.read_array().read_all(), 'utf-8')
+            if annots:
+                res['annots'] = annots.split(' ')
+        return res
+    else:
+        raise ValueError(f'Unknown Micheline tag {tag} at {reader.pos - 1}')
+
+
+def unforge_script(data) -> dict:
+    """
+    Decode binary contract script.
+    :param data: bytes or BinaryReader
+    :return: {"code": $Micheline, "storage": $Micheline}
+    """
+    reader = data if isinstance(data, BinaryReader) else BinaryReader(data)
+    return {
+        'code': unforge_micheline(reader.read_array()),
+        'storage': unforge_micheline(reader.read_array())
+    }
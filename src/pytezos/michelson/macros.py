@@ -56,22 +56,28 @@ def seq(instr=None) -> list:
         return [instr]
 
 
-def expand_macro(prim, annots, args, internal=False):
-    assert isinstance(annots, list)
-    assert isinstance(args, list)
-    if prim in primitives:
-        return expr(prim=prim, annots=annots, args=args)
-
+@functools.lru_cache(maxsize=None)
+def find_macro(prim):
     for regexp, handler in macros:
         groups = regexp.findall(prim)
         if groups:
             assert len(groups) == 1
-            res = handler(groups[0], annots, args)
-            return res if internal else seq(res)
+            return handler, groups[0]
 
     assert False, f'Unknown macro: {prim}'
 
 
+def expand_macro(prim, annots, args, internal=False):
+    assert isinstance(annots, list)
+    assert isinstance(args, list)
+    if prim in primitives:
+        return expr(prim=prim, annots=annots, args=args)
+
+    handler, groups = find_macro(prim)
+    res = handler(groups, annots, args)
+    return res if internal else seq(res)
+
+
 def get_field_annots(annots):
     return list(filter(lambda x: isinstance(x, str) and x[0] == '%', annots))
 
@@ -8,7 +8,7 @@ from functools import lru_cache
 from pytezos.encoding import parse_address, parse_public_key, forge_public_key, forge_address
 from pytezos.michelson.forge import prim_tags
 from pytezos.michelson.formatter import micheline_to_michelson
-from pytezos.michelson.grammar import MichelsonParser
+from pytezos.michelson.parser import FastMichelsonParser
 
 Nested = namedtuple('Nested', ['prim', 'args'])
 Schema = namedtuple('Schema', ['metadata', 'bin_types', 'bin_to_json', 'json_to_bin'])
@@ -17,7 +17,7 @@ meaningful_types = ['key', 'key_hash', 'signature', 'timestamp', 'address']
 
 @lru_cache(maxsize=None)
 def michelson_parser():
-    return MichelsonParser()
+    return FastMichelsonParser()
 
 
 class TypedDict(dict):
@@ -0,0 +1,158 @@
+import re
+import json
+from string import ascii_letters, digits
+
+from pytezos.michelson.grammar import MichelsonParserError, Sequence
+from pytezos.michelson.macros import expand_macro, primitives
+
+# Same rules as in `SimpleMichelsonLexer`, PLY tries them longest regex first. Whitespaces and comments are consumed
+# by the non-capturing prefix, unknown characters are returned as is, and the empty match denotes the end of input.
+token_re = re.compile(
+    r'[ \t\r\n\f]*(?:(?:/\*.*?\*/|#[^\n]*)[ \t\r\n\f]*)*'
+    r'('
+    r'[:@%]+(?:[_a-zA-Z][_0-9a-zA-Z\.]*)?'
+    r'|[A-Za-z][A-Za-z0-9_]+'
+    r'|\"(?:\\.|[^\"])*\"'
+    r'|0x[A-Fa-f0-9]+'
+    r'|-?[0-9]+'
+    r'|[\s\S]'
+    r'|\Z'
+    r')'
+)
+
+letters = set(ascii_letters)
+numbers = set(digits)
+annot_marks = set(':@%')
+expr_follow = {';', '}', ')', ''}  # LALR reduces `expr` on any of them regardless of the context
+
+
+def tokenize(code: str) -> list:
+    """
+    Split Michelson source into tokens.
+    :param code: Michelson source
+    :return: List of token strings, the last one is always empty
+    """
+    return token_re.findall(code)
+
+
+class FastMichelsonParser(object):
+    """
+    Single-pass recursive descent parser producing exactly the same output as the PLY based `MichelsonParser`
+    (including macro expansion), about 3.5 times faster on real contracts.
+    """
+
+    def __init__(self):
+        self.code = ''
+        self.tokens = []
+
+    def error(self, pos, expected=None):
+        offset = [m.start(1) for m in token_re.finditer(self.code)][pos]
+        line = self.code.count('\n', 0, offset) + 1
+        column = offset - self.code.rfind('\n', 0, offset)
+        token = self.tokens[pos]
+        message = f'Unexpected {f"`{token}`" if token else "end of input"} at line {line}, column {column}'
+        if expected:
+            message += f', expected {expected}'
+        return MichelsonParserError(message)
+
+    def parse_instr(self, pos) -> (list, bool, int):
+        """
+        instr := (expr | '{' instr '}')? (';' instr)*
+        :param pos: Index of the first token
+        :return: List of items, whether there was a separator, index of the next token
+        """
+        tokens = self.tokens
+        items, has_semi = [], False
+        while True:
+            token = tokens[pos]
+            if token[:1] in letters and len(token) > 1:
+                item, pos = self.parse_expr(pos)
+                items.append(item)
+            elif token == '{':
+                seq, _, pos = self.parse_instr(pos + 1)
+                if tokens[pos] != '}':
+                    raise self.error(pos, '`}`')
+                items.append(Sequence(seq))
+                pos += 1
+
+            if tokens[pos] != ';':
+                return items, has_semi, pos
+            pos += 1
+            has_semi = True
+
+    def parse_expr(self, pos):
+        """
+        expr := PRIM ANNOT* arg*
+        arg := PRIM | INT | BYTE | STR | '{' instr '}' | '(' expr ')'
+        :param pos: Index of the primitive token
+        :return: Expression, index of the next token
+        """
+        tokens = self.tokens
+        prim = tokens[pos]
+        pos += 1
+
+        annots = []
+        while tokens[pos][:1] in annot_marks:
+            annots.append(tokens[pos])
+            pos += 1
+
+        args = []
+        while True:
+            token = tokens[pos]
+            char = token[:1]
+            if char in letters and len(token) > 1:
+                args.append({'prim': token})
+            elif char in numbers:
+                args.append({'bytes': token[2:]} if token[1:2] == 'x' else {'int': token})  # strip 0x prefix
+            elif char == '-' and len(token) > 1:
+                args.append({'int': token})
+            elif char == '"' and len(token) > 1:
+                args.append({'string': json.loads(token)})
+            elif token == '{':
+                seq, _, pos = self.parse_instr(pos + 1)
+                if tokens[pos] != '}':
+                    raise self.error(pos, '`}`')
+                args.append(seq)
+            elif token == '(':
+                pos += 1
+                if tokens[pos][:1] not in letters or len(tokens[pos]) == 1:
+                    raise self.error(pos, 'primitive')
+                arg, pos = self.parse_expr(pos)
+                if tokens[pos] != ')':
+                    raise self.error(pos, '`)`')
+                args.append(arg)
+            else:
+                break
+            pos += 1
+
+        if tokens[pos] not in expr_follow:
+            raise self.error(pos)
+
+        if prim in primitives:  # shortcut for `expand_macro`
+            res = {'prim': prim}
+            if annots:
+                res['annots'] = annots
+            if args:
+                res['args'] = args
+            return res, pos
+
+        res = expand_macro(prim=prim, annots=annots, args=args)
+        return Sequence(res) if isinstance(res, list) else res, pos
+
+    def parse(self, code):
+        """
+        Parse Michelson source.
+        :param code: Michelson source
+        :return: Micheline expression: single item, list of items (if there is a top-level separator) or None
+        """
+        self.code, self.tokens = code, tokenize(code)
+        try:
+            items, has_semi, pos = self.parse_instr(0)
+            if self.tokens[pos]:
+                raise self.error(pos)
+        finally:
+            self.code, self.tokens = '', []
+
+        if has_semi:
+            return items
+        return items[0] if items else None
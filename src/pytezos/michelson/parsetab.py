@@ -0,0 +1,49 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'ANNOT BYTE INT LEFT_CURLY LEFT_PAREN PRIM RIGHT_CURLY RIGHT_PAREN SEMI STRinstr : expr\n| emptyinstr : instr SEMI instrinstr : LEFT_CURLY instr RIGHT_CURLYexpr : PRIM annots argsannots : annot\n| emptyannots : annots annotannot : ANNOTargs : arg\n| emptyargs : args argarg : PRIMarg : INTarg : BYTEarg : STRarg : LEFT_CURLY instr RIGHT_CURLYarg : LEFT_PAREN expr RIGHT_PARENempty :'
+    
+_lr_action_items = {'LEFT_CURLY':([0,4,5,6,8,9,10,11,14,15,16,17,18,19,20,21,22,24,27,28,],[4,4,-19,4,22,-6,-7,-9,-13,22,-8,-10,-11,-14,-15,-16,4,-12,-17,-18,]),'PRIM':([0,4,5,6,8,9,10,11,14,15,16,17,18,19,20,21,22,23,24,27,28,],[5,5,-19,5,14,-6,-7,-9,-13,14,-8,-10,-11,-14,-15,-16,5,5,-12,-17,-18,]),'SEMI':([0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,24,25,27,28,],[-19,6,-1,-2,-19,-19,-19,6,-19,-6,-7,-9,6,-4,-13,-5,-8,-10,-11,-14,-15,-16,-19,-12,6,-17,-18,]),'$end':([0,1,2,3,5,6,8,9,10,11,12,13,14,15,16,17,18,19,20,21,24,27,28,],[-19,0,-1,-2,-19,-19,-19,-6,-7,-9,-3,-4,-13,-5,-8,-10,-11,-14,-15,-16,-12,-17,-18,]),'RIGHT_CURLY':([2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,24,25,27,28,],[-1,-2,-19,-19,-19,13,-19,-6,-7,-9,-3,-4,-13,-5,-8,-10,-11,-14,-15,-16,-19,-12,27,-17,-18,]),'ANNOT':([5,8,9,10,11,16,],[11,11,-6,-7,-9,-8,]),'INT':([5,8,9,10,11,14,15,16,17,18,19,20,21,24,27,28,],[-19,19,-6,-7,-9,-13,19,-8,-10,-11,-14,-15,-16,-12,-17,-18,]),'BYTE':([5,8,9,10,11,14,15,16,17,18,19,20,21,24,27,28,],[-19,20,-6,-7,-9,-13,20,-8,-10,-11,-14,-15,-16,-12,-17,-18,]),'STR':([5,8,9,10,11,14,15,16,17,18,19,20,21,24,27,28,],[-19,21,-6,-7,-9,-13,21,-8,-10,-11,-14,-15,-16,-12,-17,-18,]),'LEFT_PAREN':([5,8,9,10,11,14,15,16,17,18,19,20,21,24,27,28,],[-19,23,-6,-7,-9,-13,23,-8,-10,-11,-14,-15,-16,-12,-17,-18,]),'RIGHT_PAREN':([5,8,9,10,11,14,15,16,17,18,19,20,21,24,26,27,28,],[-19,-19,-6,-7,-9,-13,-5,-8,-10,-11,-14,-15,-16,-12,28,-17,-18,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'instr':([0,4,6,22,],[1,7,12,25,]),'expr':([0,4,6,22,23,],[2,2,2,2,26,]),'empty':([0,4,5,6,8,22,],[3,3,10,3,18,3,]),'annots':([5,],[8,]),'annot':([5,8,],[9,16,]),'args':([8,],[15,]),'arg':([8,15,],[17,24,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> instr","S'",1,None,None,None),
+  ('instr -> expr','instr',1,'p_instr','grammar.py',55),
+  ('instr -> empty','instr',1,'p_instr','grammar.py',56),
+  ('instr -> instr SEMI instr','instr',3,'p_instr_list','grammar.py',61),
+  ('instr -> LEFT_CURLY instr RIGHT_CURLY','instr',3,'p_instr_subseq','grammar.py',70),
+  ('expr -> PRIM annots args','expr',3,'p_expr','grammar.py',78),
+  ('annots -> annot','annots',1,'p_annots','grammar.py',87),
+  ('annots -> empty','annots',1,'p_annots','grammar.py',88),
+  ('annots -> annots annot','annots',2,'p_annots_list','grammar.py',94),
+  ('annot -> ANNOT','annot',1,'p_annot','grammar.py',102),
+  ('args -> arg','args',1,'p_args','grammar.py',106),
+  ('args -> empty','args',1,'p_args','grammar.py',107),
+  ('args -> args arg','args',2,'p_args_list','grammar.py',114),
+  ('arg -> PRIM','arg',1,'p_arg_prim','grammar.py',122),
+  ('arg -> INT','arg',1,'p_arg_int','grammar.py',126),
+  ('arg -> BYTE','arg',1,'p_arg_byte','grammar.py',130),
+  ('arg -> STR','arg',1,'p_arg_str','grammar.py',134),
+  ('arg -> LEFT_CURLY instr RIGHT_CURLY','arg',3,'p_arg_subseq','grammar.py',138),
+  ('arg -> LEFT_PAREN expr RIGHT_PAREN','arg',3,'p_arg_group','grammar.py',147),
+  ('empty -> <empty>','empty',0,'p_empty','grammar.py',151),
+]
@@ -0,0 +1,203 @@
+from collections import deque
+from typing import Generator
+from loguru import logger
+
+from pytezos.operation.content import ContentMixin
+from pytezos.operation.fees import hard_gas_limit_per_operation, hard_storage_limit_per_operation, \
+    hard_gas_limit_per_block, max_operation_data_length, minimal_nanotez_per_byte, extra_size_per_content
+from pytezos.operation.forge import operation_size
+from pytezos.operation.group import OperationGroup, validation_passes
+from pytezos.rpc.errors import RpcError
+from pytezos.interop import Interop
+from pytezos.tools.docstring import get_class_docstring
+
+
+def content_key(content) -> tuple:
+    """
+    Contents with the same key are expected to consume similar amount of gas.
+    """
+    return content['kind'], content.get('destination'), content.get('parameters', {}).get('entrypoint')
+
+
+class BatchBuilder(Interop, ContentMixin):
+    """
+    Packs an arbitrary number of manager operations into as few operation groups as possible.
+    Contents are simulated in large chunks (`autofill`), every chunk is cut where the total gas limit,
+    storage limit, or forged size of the group would exceed the limits; the rest goes to the next group.
+    Counters follow the head counter until the groups are signed, then the shared `CounterManager` moves them
+    after the groups in flight, so that the groups can be injected one after another without waiting for inclusion.
+    Note that each group is simulated against the current head, not against the state after the previous groups.
+    """
+
+    def __init__(self, contents=None, max_gas=hard_gas_limit_per_block, max_storage=None,
+                 max_size=max_operation_data_length, gas_reserve=100, shell=None, key=None):
+        """
+        :param contents: Initial list of operation contents or operation groups (optional)
+        :param max_gas: Max total gas limit of a group, default is `hard_gas_limit_per_block`
+        :param max_storage: Max total storage limit of a group (optional), bounds the burn per group
+        :param max_size: Max size of a signed group in bytes, default is `max_operation_data_length`
+        :param gas_reserve: Add a safe reserve for gas limit (default is 100)
+        """
+        super(BatchBuilder, self).__init__(shell=shell, key=key)
+        self.contents = contents or []
+        self.max_gas = max_gas
+        self.max_storage = max_storage
+        self.max_size = max_size
+        self.gas_reserve = gas_reserve
+        self.simulations = 0
+        self._gas = dict()  # content key => max gas limit seen
+
+    def __repr__(self):
+        res = [
+            super(BatchBuilder, self).__repr__(),
+            '\nLimits',
+            f'gas: {self.max_gas}',
+            f'storage: {self.max_storage or "n/a"}',
+            f'size: {self.max_size}',
+            '\nPending',
+            f'contents: {len(self.contents)}',
+            '\nHelpers',
+            get_class_docstring(self.__class__)
+        ]
+        return '\n'.join(res)
+
+    def _spawn(self, **kwargs):
+        return BatchBuilder(
+            contents=kwargs.get('contents', self.contents.copy()),
+            max_gas=kwargs.get('max_gas', self.max_gas),
+            max_storage=kwargs.get('max_storage', self.max_storage),
+            max_size=kwargs.get('max_size', self.max_size),
+            gas_reserve=kwargs.get('gas_reserve', self.gas_reserve),
+            shell=kwargs.get('shell', self.shell),
+            key=kwargs.get('key', self.key)
+        )
+
+    def operation(self, content):
+        """
+        Add content to the batch (in place, unlike `OperationGroup.operation`).
+        :param content: Kind-specific operation body or OperationGroup
+        :return: BatchBuilder
+        """
+        self.contents.append(content)
+        return self
+
+    def extend(self, contents):
+        """
+        Add multiple contents to the batch.
+        :param contents: Iterable of operation contents or operation groups
+        :return: BatchBuilder
+        """
+        self.contents.extend(contents)
+        return self
+
+    def _iter_contents(self, contents) -> Generator:
+        for item in contents:
+            for content in item.contents if isinstance(item, OperationGroup) else [item]:
+                if validation_passes[content['kind']] != 3:
+                    raise ValueError(f'Only manager operations can be batched, got {content["kind"]}')
+                yield content
+
+    def _estimate_gas(self, content) -> int:
+        seen = self._gas.get(content_key(content))
+        default = int(content['gas_limit'])
+        return default if seen is None else min(default, seen + seen // 10)
+
+    def _fit(self, contents) -> int:
+        """
+        Get the number of simulated contents fitting into a single group.
+        """
+        gas, storage, size = 0, 0, 32 + 64
+        for i, content in enumerate(contents):
+            gas_limit, storage_limit = int(content['gas_limit']), int(content['storage_limit'])
+            if gas_limit > hard_gas_limit_per_operation or storage_limit > hard_storage_limit_per_operation:
+                raise ValueError(f'Content exceeds the per-operation limits ({gas_limit} gas, {storage_limit} storage)'
+                                 f':\n{content}')
+
+            gas += gas_limit
+            storage += storage_limit
+            size += operation_size(content) + 1  # counter can get a byte longer when moved at signing
+            if gas > self.max_gas or size > self.max_size \
+                    or (self.max_storage is not None and storage > self.max_storage):
+                if i == 0:
+                    raise ValueError(f'Content does not fit into an empty group:\n{content}')
+                return i
+        return len(contents)
+
+    def iter_groups(self, contents=None) -> Generator:
+        """
+        Lazily pack contents into filled and simulated operation groups.
+        :param contents: Iterable (possibly infinite) of operation contents or groups, default is the added ones
+        :return: Generator of OperationGroup, ready to sign
+        """
+        stream = self._iter_contents(self.contents if contents is None else contents)
+        pending = deque()
+        source = self.key.public_key_hash()
+        head_counter, template = None, None
+
+        def pull():
+            content = next(stream)
+            content = {**content, 'counter': str(head_counter + 1)}  # placeholder, fill estimates the size with it
+            return template._spawn(contents=[content]).fill().contents[0]
+
+        while True:
+            # simulation is done against the head state, previous groups (even if injected) are not there yet
+            head_counter = int(self.shell.contracts[source].counter())
+            snapshot = self.shell.chain_context.snapshot()
+            # group fields are set, so that filling the contents one by one does not query the context again
+            template = OperationGroup(chain_id=snapshot['chain_id'], branch=snapshot['branch'],
+                                      protocol=snapshot['protocol'], shell=self.shell, key=self.key,
+                                      managed=True)
+
+            candidate, gas, size = [], 0, 32 + 64
+            while True:
+                if not pending:
+                    try:
+                        pending.append(pull())
+                    except StopIteration:
+                        break
+                content = pending[0]
+                estimate, length = self._estimate_gas(content), operation_size(content)
+                if candidate and (gas + estimate > self.max_gas or size + length > self.max_size):
+                    break
+                candidate.append((pending.popleft(), estimate))
+                gas, size = gas + estimate, size + length
+
+            if not candidate:
+                return
+
+            simulated = [{**content, 'gas_limit': str(estimate), 'counter': str(head_counter + i + 1)}
+                         for i, (content, estimate) in enumerate(candidate)]
+            try:
+                self.simulations += 1
+                opg = template._spawn(contents=simulated).autofill(gas_reserve=self.gas_reserve)
+            except RpcError as e:
+                if all(map(lambda x: x[1] == int(x[0]['gas_limit']), candidate)):
+                    raise
+                logger.debug(f'estimated gas limits are too low, simulating with default ones: {e}')
+                for content, _ in candidate:
+                    self._gas.pop(content_key(content), None)
+                pending.extendleft(reversed([content for content, _ in candidate]))
+                continue
+
+            for content in opg.contents:
+                key = content_key(content)
+                self._gas[key] = max(self._gas.get(key, 0), int(content['gas_limit']))
+
+            num_contents = self._fit(opg.contents)
+            if num_contents < len(opg.contents):
+                pending.extendleft(reversed([content for content, _ in candidate[num_contents:]]))
+                # fees were calculated for the longer group (branch and signature size is split between contents)
+                delta = minimal_nanotez_per_byte * (extra_size_per_content(num_contents)
+                                                    - extra_size_per_content(len(opg.contents)))
+                for content in opg.contents[:num_contents]:
+                    content['fee'] = str(int(content['fee']) + int(delta))
+
+            logger.debug(f'packed {num_contents} contents, {len(pending)} left')
+            yield opg._spawn(contents=opg.contents[:num_contents])
+
+    def build(self) -> list:
+        """
+        Pack the added contents into operation groups.
+        :return: list of OperationGroup, ready to sign
+        """
+        return list(self.iter_groups())
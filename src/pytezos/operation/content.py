@@ -70,8 +70,8 @@ class ContentMixin:
     def double_baking_evidence(self, bh1, bh2):
         """
         Provide evidence of double baking (two different blocks at the same height).
-        :param bh1: First block hash
-        :param bh2: Second block hash
+        :param bh1: First block header (full, signed)
+        :param bh2: Second block header
         :return: dict or OperationGroup
         """
         return self.operation({
@@ -125,7 +125,7 @@ class ContentMixin:
         Can only be submitted during Testing_vote or Promotion_vote periods, and only once per period.
         More info https://tezos.gitlab.io/master/whitedoc/voting.html
         :param proposal: Hash of the proposal
-        :param ballot: 'Yay', 'Nay' or 'Pass'
+        :param ballot: 'yay', 'nay' or 'pass'
         :param source: Public key hash (of the signatory), leave None for autocomplete
         :param period: Number of the current voting period, leave None for autocomplete
         :return: dict or OperationGroup
@@ -135,7 +135,7 @@ class ContentMixin:
             'source': source,
             'period': str(period),
             'proposal': proposal,
-            'ballot': ballot
+            'ballot': ballot.lower()
         })
 
     @inline_doc
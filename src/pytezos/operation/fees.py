@@ -1,20 +1,26 @@
-from pytezos.operation.forge import forge_operation
+from pytezos.operation.forge import operation_size
 
 hard_gas_limit_per_operation = 400000
 hard_storage_limit_per_operation = 60000
+hard_gas_limit_per_block = 8000000
+max_operation_data_length = 16 * 1024
 minimal_fees = 100
 minimal_nanotez_per_byte = 1
 minimal_nanotez_per_gas_unit = .1
 
 
 def calculate_fee(content, consumed_gas, extra_size, reserve=10):
-    size = len(forge_operation(content)) + extra_size
+    size = operation_size(content) + extra_size
     fee = minimal_fees \
         + minimal_nanotez_per_byte * size \
         + int(minimal_nanotez_per_gas_unit * consumed_gas)
     return fee + reserve
 
 
+def extra_size_per_content(num_contents):
+    return (32 + 64) // num_contents + 1  # size of serialized branch and signature, split between contents
+
+
 def default_fee(content):
     return calculate_fee(
         content=content,
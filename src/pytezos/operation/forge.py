@@ -1,12 +1,14 @@
-from pytezos.encoding import forge_address, forge_bool, forge_nat, forge_array, forge_public_key, \
-    forge_base58
-from pytezos.michelson.forge import forge_entrypoint, forge_micheline, forge_script
+from calendar import timegm
+from datetime import datetime, timezone
 
-# TODO: https://tezos.gitlab.io/master/protocols/005_PsBABY5H.html#changes-to-the-binary-format-of-operations
+from pytezos.encoding import base58_encode, BinaryWriter, SizeCounter, BinaryReader, unforge_nat, unforge_bool, \
+    unforge_base58, unforge_address, unforge_public_key
+from pytezos.michelson.forge import forge_entrypoint, write_micheline, write_script, unforge_entrypoint, \
+    unforge_micheline, unforge_script
 
 operation_tags = {
     'endorsement': 0,
-    'proposal': 5,
+    'proposals': 5,
     'ballot': 6,
     'seed_nonce_revelation': 1,
     'double_endorsement_evidence': 2,
@@ -17,99 +19,383 @@ operation_tags = {
     'origination': 109,
     'delegation': 110
 }
+ballot_tags = {
+    'yay': 0,
+    'nay': 1,
+    'pass': 2
+}
+
+operation_kinds = {tag: kind for kind, tag in operation_tags.items()}
+ballot_names = {tag: ballot for ballot, tag in ballot_tags.items()}
 
 
-def forge_operation(content):
+def write_operation(writer: BinaryWriter, content):
     encode_content = {
-        'activate_account': forge_activate_account,
-        'reveal': forge_reveal,
-        'transaction': forge_transaction,
-        'origination': forge_origination,
-        'delegation': forge_delegation
+        'endorsement': write_endorsement,
+        'seed_nonce_revelation': write_seed_nonce_revelation,
+        'double_endorsement_evidence': write_double_endorsement_evidence,
+        'double_baking_evidence': write_double_baking_evidence,
+        'activate_account': write_activate_account,
+        'proposals': write_proposals,
+        'ballot': write_ballot,
+        'reveal': write_reveal,
+        'transaction': write_transaction,
+        'origination': write_origination,
+        'delegation': write_delegation
     }
     encode_proc = encode_content.get(content['kind'])
     if not encode_proc:
         raise NotImplementedError(content['kind'])
 
-    return encode_proc(content)
+    writer.write_nat(operation_tags[content['kind']])
+    encode_proc(writer, content)
 
 
-def forge_operation_group(operation_group):
-    res = forge_base58(operation_group['branch'])
-    res += b''.join(map(forge_operation, operation_group['contents']))
-    return res
+def forge_operation(content) -> bytes:
+    writer = BinaryWriter()
+    write_operation(writer, content)
+    return writer.getvalue()
 
 
-def forge_activate_account(content: dict):
-    res = forge_nat(operation_tags[content['kind']])
-    res += forge_base58(content['pkh'])
-    res += bytes.fromhex(content['secret'])
-    return res
+def forge_operation_group(operation_group) -> bytes:
+    writer = BinaryWriter()
+    writer.write_base58(operation_group['branch'])
+    for content in operation_group['contents']:
+        write_operation(writer, content)
+    return writer.getvalue()
 
 
-def forge_reveal(content):
-    res = forge_nat(operation_tags[content['kind']])
-    res += forge_address(content['source'], tz_only=True)
-    res += forge_nat(int(content['fee']))
-    res += forge_nat(int(content['counter']))
-    res += forge_nat(int(content['gas_limit']))
-    res += forge_nat(int(content['storage_limit']))
-    res += forge_public_key(content['public_key'])
-    return res
+def operation_size(content) -> int:
+    """
+    Get the size of the forged operation content without forging it.
+    :param content: Operation content
+    :return: int
+    """
+    counter = SizeCounter()
+    write_operation(counter, content)
+    return len(counter)
+
+
+def write_timestamp(writer: BinaryWriter, value):
+    if isinstance(value, str):
+        value = timegm(datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').utctimetuple())
+    writer.write_int_fixed(value, 8)
+
+
+def write_endorsement(writer: BinaryWriter, content):
+    writer.write_int_fixed(content['level'], 4)
+
+
+def write_inline_endorsement(writer: BinaryWriter, operation):
+    writer.write_base58(operation['branch'])
+    write_operation(writer, operation['operations'])
+    if operation.get('signature'):
+        writer.write_base58(operation['signature'])
+
+
+def write_block_header(writer: BinaryWriter, header):
+    writer.write_int_fixed(header['level'], 4)
+    writer.write_int_fixed(header['proto'], 1)
+    writer.write_base58(header['predecessor'])
+    write_timestamp(writer, header['timestamp'])
+    writer.write_int_fixed(header['validation_pass'], 1)
+    writer.write_base58(header['operations_hash'])
+
+    position = writer.begin_array()
+    for fitness in header['fitness']:
+        writer.write_array(bytes.fromhex(fitness))
+    writer.end_array(position)
+
+    writer.write_base58(header['context'])
+    writer.write_int_fixed(header['priority'], 2)
+    writer.write(bytes.fromhex(header['proof_of_work_nonce']))
+
+    if header.get('seed_nonce_hash'):
+        writer.write_bool(True)
+        writer.write_base58(header['seed_nonce_hash'])
+    else:
+        writer.write_bool(False)
+
+    writer.write_base58(header['signature'])
+
+
+def write_seed_nonce_revelation(writer: BinaryWriter, content):
+    writer.write_int_fixed(content['level'], 4)
+    writer.write(bytes.fromhex(content['nonce']))
+
+
+def write_double_endorsement_evidence(writer: BinaryWriter, content):
+    for op in [content['op1'], content['op2']]:
+        position = writer.begin_array()
+        write_inline_endorsement(writer, op)
+        writer.end_array(position)
+
+
+def write_double_baking_evidence(writer: BinaryWriter, content):
+    for header in [content['bh1'], content['bh2']]:
+        position = writer.begin_array()
+        write_block_header(writer, header)
+        writer.end_array(position)
 
 
-def forge_transaction(content):
-    res = forge_nat(operation_tags[content['kind']])
-    res += forge_address(content['source'], tz_only=True)
-    res += forge_nat(int(content['fee']))
-    res += forge_nat(int(content['counter']))
-    res += forge_nat(int(content['gas_limit']))
-    res += forge_nat(int(content['storage_limit']))
-    res += forge_nat(int(content['amount']))
-    res += forge_address(content['destination'])
+def write_activate_account(writer: BinaryWriter, content):
+    writer.write_base58(content['pkh'])
+    writer.write(bytes.fromhex(content['secret']))
+
+
+def write_proposals(writer: BinaryWriter, content):
+    writer.write_address(content['source'], tz_only=True)
+    writer.write_int_fixed(content['period'], 4)
+    position = writer.begin_array()
+    for proposal in content['proposals']:
+        writer.write_base58(proposal)
+    writer.end_array(position)
+
+
+def write_ballot(writer: BinaryWriter, content):
+    writer.write_address(content['source'], tz_only=True)
+    writer.write_int_fixed(content['period'], 4)
+    writer.write_base58(content['proposal'])
+    writer.write_int_fixed(ballot_tags[content['ballot']], 1)
+
+
+def write_manager_fields(writer: BinaryWriter, content):
+    writer.write_address(content['source'], tz_only=True)
+    writer.write_nat(int(content['fee']))
+    writer.write_nat(int(content['counter']))
+    writer.write_nat(int(content['gas_limit']))
+    writer.write_nat(int(content['storage_limit']))
+
+
+def write_reveal(writer: BinaryWriter, content):
+    write_manager_fields(writer, content)
+    writer.write_public_key(content['public_key'])
+
+
+def write_transaction(writer: BinaryWriter, content):
+    write_manager_fields(writer, content)
+    writer.write_nat(int(content['amount']))
+    writer.write_address(content['destination'])
 
     if content.get('parameters'):
-        res += forge_bool(True)
-        res += forge_entrypoint(content['parameters']['entrypoint'])
-        res += forge_array(forge_micheline(content['parameters']['value']))
+        writer.write_bool(True)
+        writer.write(forge_entrypoint(content['parameters']['entrypoint']))
+        position = writer.begin_array()
+        write_micheline(writer, content['parameters']['value'])
+        writer.end_array(position)
     else:
-        res += forge_bool(False)
+        writer.write_bool(False)
 
-    return res
 
+def write_origination(writer: BinaryWriter, content):
+    write_manager_fields(writer, content)
+    writer.write_nat(int(content['balance']))
+
+    if content.get('delegate'):
+        writer.write_bool(True)
+        writer.write_address(content['delegate'], tz_only=True)
+    else:
+        writer.write_bool(False)
+
+    write_script(writer, content['script'])
 
-def forge_origination(content):
-    res = forge_nat(operation_tags[content['kind']])
-    res += forge_address(content['source'], tz_only=True)
-    res += forge_nat(int(content['fee']))
-    res += forge_nat(int(content['counter']))
-    res += forge_nat(int(content['gas_limit']))
-    res += forge_nat(int(content['storage_limit']))
-    res += forge_nat(int(content['balance']))
+
+def write_delegation(writer: BinaryWriter, content):
+    write_manager_fields(writer, content)
 
     if content.get('delegate'):
-        res += forge_bool(True)
-        res += forge_address(content['delegate'], tz_only=True)
+        writer.write_bool(True)
+        writer.write_address(content['delegate'], tz_only=True)
     else:
-        res += forge_bool(False)
+        writer.write_bool(False)
+
 
-    res += forge_script(content['script'])
+def unforge_operation_group(data, signed=False) -> dict:
+    """
+    Decode forged operation group, e.g. binary payload of an injected operation.
+    :param data: bytes or memoryview
+    :param signed: Data ends with a signature, default is False
+    :return: {"branch": $block_hash, "contents": [...], "signature"?: $generic_signature}
+    """
+    data = data if isinstance(data, memoryview) else memoryview(data)
+    reader = BinaryReader(data, end=len(data) - 64 if signed else None)
+    res = {
+        'branch': unforge_base58(reader, b'B'),
+        'contents': []
+    }
+    while not reader.at_end():
+        res['contents'].append(unforge_operation(reader))
 
+    if signed:
+        res['signature'] = base58_encode(bytes(data[-64:]), b'sig').decode()
     return res
 
 
-def forge_delegation(content):
-    res = forge_nat(operation_tags[content['kind']])
-    res += forge_address(content['source'], tz_only=True)
-    res += forge_nat(int(content['fee']))
-    res += forge_nat(int(content['counter']))
-    res += forge_nat(int(content['gas_limit']))
-    res += forge_nat(int(content['storage_limit']))
+def unforge_operation(data) -> dict:
+    """
+    Decode operation content.
+    :param data: bytes or BinaryReader
+    :return: dict
+    """
+    decode_content = {
+        'endorsement': unforge_endorsement,
+        'seed_nonce_revelation': unforge_seed_nonce_revelation,
+        'double_endorsement_evidence': unforge_double_endorsement_evidence,
+        'double_baking_evidence': unforge_double_baking_evidence,
+        'activate_account': unforge_activate_account,
+        'proposals': unforge_proposals,
+        'ballot': unforge_ballot,
+        'reveal': unforge_reveal,
+        'transaction': unforge_transaction,
+        'origination': unforge_origination,
+        'delegation': unforge_delegation
+    }
+    reader = data if isinstance(data, BinaryReader) else BinaryReader(data)
+    tag = unforge_nat(reader)
+    if tag not in operation_kinds:
+        raise NotImplementedError(f'Operation tag {tag}')
+
+    kind = operation_kinds[tag]
+    return {'kind': kind, **decode_content[kind](reader)}
+
+
+def unforge_int_fixed(reader: BinaryReader, length) -> int:
+    return int.from_bytes(reader.read(length), 'big')
+
+
+def unforge_timestamp(reader: BinaryReader) -> str:
+    value = unforge_int_fixed(reader, 8)
+    return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def unforge_endorsement(reader: BinaryReader) -> dict:
+    return {
+        'level': unforge_int_fixed(reader, 4)
+    }
+
+
+def unforge_inline_endorsement(reader: BinaryReader) -> dict:
+    res = {
+        'branch': unforge_base58(reader, b'B'),
+        'operations': unforge_operation(reader)
+    }
+    if not reader.at_end():
+        res['signature'] = unforge_base58(reader, b'sig')
+    return res
+
+
+def unforge_block_header(reader: BinaryReader) -> dict:
+    res = {
+        'level': unforge_int_fixed(reader, 4),
+        'proto': unforge_int_fixed(reader, 1),
+        'predecessor': unforge_base58(reader, b'B'),
+        'timestamp': unforge_timestamp(reader),
+        'validation_pass': unforge_int_fixed(reader, 1),
+        'operations_hash': unforge_base58(reader, b'LLo'),
+        'fitness': []
+    }
+
+    fitness = reader.read_array()
+    while not fitness.at_end():
+        res['fitness'].append(fitness.read_array().read_all().hex())
+
+    res['context'] = unforge_base58(reader, b'Co')
+    res['priority'] = unforge_int_fixed(reader, 2)
+    res['proof_of_work_nonce'] = reader.read(8).hex()
+    if unforge_bool(reader):
+        res['seed_nonce_hash'] = unforge_base58(reader, b'nce')
+    res['signature'] = unforge_base58(reader, b'sig')
+    return res
+
+
+def unforge_seed_nonce_revelation(reader: BinaryReader) -> dict:
+    return {
+        'level': unforge_int_fixed(reader, 4),
+        'nonce': reader.read(32).hex()
+    }
+
+
+def unforge_double_endorsement_evidence(reader: BinaryReader) -> dict:
+    return {
+        'op1': unforge_inline_endorsement(reader.read_array()),
+        'op2': unforge_inline_endorsement(reader.read_array())
+    }
+
+
+def unforge_double_baking_evidence(reader: BinaryReader) -> dict:
+    return {
+        'bh1': unforge_block_header(reader.read_array()),
+        'bh2': unforge_block_header(reader.read_array())
+    }
+
+
+def unforge_activate_account(reader: BinaryReader) -> dict:
+    return {
+        'pkh': unforge_base58(reader, b'tz1'),
+        'secret': reader.read(20).hex()
+    }
+
+
+def unforge_proposals(reader: BinaryReader) -> dict:
+    res = {
+        'source': unforge_address(reader, tz_only=True),
+        'period': unforge_int_fixed(reader, 4),
+        'proposals': []
+    }
+    proposals = reader.read_array()
+    while not proposals.at_end():
+        res['proposals'].append(unforge_base58(proposals, b'P'))
+    return res
+
+
+def unforge_ballot(reader: BinaryReader) -> dict:
+    return {
+        'source': unforge_address(reader, tz_only=True),
+        'period': unforge_int_fixed(reader, 4),
+        'proposal': unforge_base58(reader, b'P'),
+        'ballot': ballot_names[unforge_int_fixed(reader, 1)]
+    }
+
+
+def unforge_manager_fields(reader: BinaryReader) -> dict:
+    return {
+        'source': unforge_address(reader, tz_only=True),
+        'fee': str(unforge_nat(reader)),
+        'counter': str(unforge_nat(reader)),
+        'gas_limit': str(unforge_nat(reader)),
+        'storage_limit': str(unforge_nat(reader))
+    }
+
+
+def unforge_reveal(reader: BinaryReader) -> dict:
+    res = unforge_manager_fields(reader)
+    res['public_key'] = unforge_public_key(reader)
+    return res
+
+
+def unforge_transaction(reader: BinaryReader) -> dict:
+    res = unforge_manager_fields(reader)
+    res['amount'] = str(unforge_nat(reader))
+    res['destination'] = unforge_address(reader)
+    if unforge_bool(reader):
+        res['parameters'] = {
+            'entrypoint': unforge_entrypoint(reader),
+            'value': unforge_micheline(reader.read_array())
+        }
+    return res
+
+
+def unforge_origination(reader: BinaryReader) -> dict:
+    res = unforge_manager_fields(reader)
+    res['balance'] = str(unforge_nat(reader))
+    if unforge_bool(reader):
+        res['delegate'] = unforge_address(reader, tz_only=True)
+    res['script'] = unforge_script(reader)
+    return res
 
-    if content.get('delegate'):
-        res += forge_bool(True)
-        res += forge_address(content['delegate'], tz_only=True)
-    else:
-        res += forge_bool(False)
 
+def unforge_delegation(reader: BinaryReader) -> dict:
+    res = unforge_manager_fields(reader)
+    if unforge_bool(reader):
+        res['delegate'] = unforge_address(reader, tz_only=True)
     return res
@@ -1,9 +1,13 @@
+from copy import deepcopy
+from itertools import count
 from pprint import pformat
+from random import random
 
 from pytezos.crypto import blake2b_32
 from pytezos.operation.content import ContentMixin
 from pytezos.operation.forge import forge_operation_group
-from pytezos.operation.fees import calculate_fee, default_fee, default_gas_limit, default_storage_limit, burn_cap
+from pytezos.operation.fees import calculate_fee, default_fee, default_gas_limit, default_storage_limit, burn_cap, \
+    extra_size_per_content
 from pytezos.operation.result import OperationResult
 from pytezos.rpc.errors import RpcError
 from pytezos.encoding import forge_base58, base58_encode
@@ -12,7 +16,7 @@ from pytezos.tools.docstring import get_class_docstring
 
 validation_passes = {
     'endorsement': 0,
-    'proposal': 1,
+    'proposals': 1,
     'ballot': 1,
     'seed_nonce_revelation': 2,
     'double_endorsement_evidence': 2,
@@ -26,14 +30,21 @@ validation_passes = {
 
 
 class OperationGroup(Interop, ContentMixin):
+    validation_rate = 1.  # share of signed groups forged remotely too, to compare with the local result
 
-    def __init__(self, contents=None, protocol=None, chain_id=None, branch=None, signature=None, shell=None, key=None):
+    def __init__(self, contents=None, protocol=None, chain_id=None, branch=None, signature=None, shell=None, key=None,
+                 managed=False):
+        """
+        :param managed: Counters are placeholders following the head counter (set by `fill`), the counter manager
+        hands out the actual ones on signing
+        """
         super(OperationGroup, self).__init__(shell=shell, key=key)
         self.contents = contents or []
         self.protocol = protocol
         self.chain_id = chain_id
         self.branch = branch
         self.signature = signature
+        self.managed = managed
 
     def __repr__(self):
         res = [
@@ -53,7 +64,8 @@ class OperationGroup(Interop, ContentMixin):
             branch=kwargs.get('branch', self.branch),
             signature=kwargs.get('signature', self.signature),
             shell=kwargs.get('shell', self.shell),
-            key=kwargs.get('key', self.key)
+            key=kwargs.get('key', self.key),
+            managed=kwargs.get('managed', self.managed)
         )
 
     def json_payload(self) -> dict:
@@ -92,19 +104,27 @@ class OperationGroup(Interop, ContentMixin):
         (not optimal, use `autofill` to simulate operation and get precise values).
         :return: OperationGroup
         """
-        chain_id = self.chain_id or self.shell.chains.main.chain_id()
-        branch = self.branch or self.shell.head.predecessor.hash()
-        protocol = self.protocol or self.shell.head.header()['protocol']
+        context = self.shell.chain_context
+        snapshot = context.snapshot() if not all([self.chain_id, self.branch, self.protocol]) else {}
+        chain_id = self.chain_id or snapshot['chain_id']
+        branch = self.branch or snapshot['branch']
+        protocol = self.protocol or snapshot['protocol']
         source = self.key.public_key_hash()
-        counter = self.shell.contracts[source].count()
+        counter = None
+
+        def next_counter(content):
+            nonlocal counter
+            if counter is None:
+                counter = count(self.shell.counter_manager.head_counter(source) + 1)
+            return str(next(counter))
 
         replace_map = {
             'pkh': source,
             'source': source,
             'delegate': source,
-            'counter': lambda x: str(next(counter)),
+            'counter': next_counter,
             'secret': lambda x: self.key.activation_code,
-            'period': lambda x: str(self.shell.head.voting_period()),
+            'period': lambda x: str(context.voting_period()),
             'public_key': lambda x: self.key.public_key(),
             'manager_pubkey': source,  # I know, it hurts
             'fee': lambda x: str(default_fee(x)),
@@ -123,7 +143,8 @@ class OperationGroup(Interop, ContentMixin):
             contents=list(map(fill_content, self.contents)),
             protocol=protocol,
             chain_id=chain_id,
-            branch=branch
+            branch=branch,
+            managed=self.managed or counter is not None
         )
 
     def run(self):
@@ -134,7 +155,7 @@ class OperationGroup(Interop, ContentMixin):
         return self.shell.head.helpers.scripts.run_operation.post({
             'operation': {
                 'branch': self.branch,
-                'contents': self.contents,
+                'contents': self.shell.counter_manager.rebase(self.contents),
                 'signature': base58_encode(b'0' * 64, b'sig').decode()
             },
             'chain_id': self.chain_id
@@ -170,10 +191,11 @@ class OperationGroup(Interop, ContentMixin):
         if not OperationResult.is_applied(opg_with_metadata):
             raise RpcError.from_errors(OperationResult.errors(opg_with_metadata)) from None
 
-        extra_size = (32 + 64) // len(opg.contents) + 1  # size of serialized branch and signature)
+        extra_size = extra_size_per_content(len(opg.contents))
 
-        def fill_content(content):
+        def fill_content(content, filled):
             if validation_passes[content['kind']] == 3:
+                content['counter'] = filled['counter']  # simulated one could be shifted
                 consumed_gas = OperationResult.consumed_gas(content) + gas_reserve
                 paid_storage_size_diff = OperationResult.paid_storage_size_diff(content)
                 fee = calculate_fee(content, consumed_gas, extra_size)
@@ -186,13 +208,15 @@ class OperationGroup(Interop, ContentMixin):
             content.pop('metadata')
             return content
 
-        opg.contents = list(map(fill_content, opg_with_metadata['contents']))
+        opg.contents = list(map(fill_content, opg_with_metadata['contents'], opg.contents))
         return opg
 
-    def sign(self):
+    def sign(self, validate=None):
         """
         Sign the operation group with the key specified by `using`.
-        :return: OperationGroup
+        :param validate: Forge remotely also and compare results, default is to do that for a share of groups
+        specified by `OperationGroup.validation_rate` (all of them by default)
+        :return: SealedOperationGroup
         """
         validation_pass = validation_passes[self.contents[0]['kind']]
         if any(map(lambda x: validation_passes[x['kind']] != validation_pass, self.contents)):
@@ -204,10 +228,34 @@ class OperationGroup(Interop, ContentMixin):
         else:
             watermark = b'\x03'
 
-        message = watermark + bytes.fromhex(self.forge())
-        signature = self.key.sign(message=message, generic=True)
+        if validate is None:
+            validate = random() < self.validation_rate
 
-        return self._spawn(signature=signature)
+        if self.managed:
+            # counters set by `fill` are handed out by the manager only now, so that dry runs do not take them
+            opg = self._spawn(contents=self.shell.counter_manager.reserve(self.contents), managed=False)
+        else:
+            self.shell.counter_manager.check(self.contents)
+            opg = self
+
+        try:
+            forged = bytes.fromhex(opg.forge(validate=validate))
+            signature = self.key.sign(message=watermark + forged, generic=True)
+        except Exception:
+            opg.release_counters()
+            raise
+
+        return SealedOperationGroup(
+            forged=forged,
+            validated=validate,
+            contents=opg.contents,
+            protocol=self.protocol,
+            chain_id=self.chain_id,
+            branch=self.branch,
+            signature=signature,
+            shell=self.shell,
+            key=self.key
+        )
 
     def hash(self):
         """
@@ -228,21 +276,41 @@ class OperationGroup(Interop, ContentMixin):
         return self.shell.head.helpers.preapply.operations.post(
             operations=[self.json_payload()])[0]
 
+    def _get_counters(self) -> list:
+        return [int(x['counter']) for x in self.contents if x.get('counter')]
+
+    def release_counters(self):
+        """
+        Return counters to the counter manager if the operation group is not going to be injected.
+        """
+        counters = self._get_counters()
+        if counters:
+            self.shell.counter_manager.release(self.contents[0]['source'], counters)
+
     def inject(self, _async=True, preapply=True, check_result=True, num_blocks_wait=2):
         """
         Inject signed operation group.
         :param _async: do not wait for operation inclusion (default is True)
-        :param preapply:
+        :param preapply: Check the operation group before injection, skipped if other groups of the source are in flight
         :param check_result:
         :param num_blocks_wait:
         """
-        if preapply:
-            opg_with_metadata = self.preapply()
-            if not OperationResult.is_applied(opg_with_metadata):
-                raise RpcError.from_errors(OperationResult.errors(opg_with_metadata)) from None
-
-        opg_hash = self.shell.injection.operation.post(
-            operation=self.binary_payload(), _async=False)
+        try:
+            # operations in flight are not applied to the head state yet, so preapply would fail
+            if preapply and self.shell.counter_manager.head_offset(self.contents) == 0:
+                opg_with_metadata = self.preapply()
+                if not OperationResult.is_applied(opg_with_metadata):
+                    raise RpcError.from_errors(OperationResult.errors(opg_with_metadata)) from None
+
+            opg_hash = self.shell.injection.operation.post(
+                operation=self.binary_payload(), _async=False)
+        except Exception:
+            self.release_counters()
+            raise
+
+        counters = self._get_counters()
+        if counters:
+            self.shell.counter_manager.track(self.contents[0]['source'], opg_hash, counters)
 
         if _async:
             return {
@@ -273,3 +341,77 @@ class OperationGroup(Interop, ContentMixin):
         :return: OperationResult
         """
         return OperationResult.from_operation_group(self.preapply())
+
+
+class SealedOperationGroup(OperationGroup):
+    """
+    Signed operation group which is not supposed to change: it is forged once (remote validation included),
+    binary payload and hash are calculated once too. Any modification produces a regular operation group.
+    """
+
+    def __init__(self, forged: bytes, validated=False, contents=None, protocol=None, chain_id=None, branch=None,
+                 signature=None, shell=None, key=None):
+        """
+        :param forged: Forged operation group (without signature)
+        :param validated: Whether forged bytes have been compared with the remote forging result
+        """
+        super(SealedOperationGroup, self).__init__(
+            contents=contents, protocol=protocol, chain_id=chain_id, branch=branch, signature=signature,
+            shell=shell, key=key)
+        if not signature:
+            raise ValueError('Not signed')
+
+        binary_payload = forged + forge_base58(signature)
+        self.__dict__.update(
+            _forged=forged,
+            _validated=validated,
+            _binary_payload=binary_payload,
+            _hash=base58_encode(blake2b_32(binary_payload).digest(), b'o').decode()
+        )
+
+    def __setattr__(self, key, value):
+        if '_hash' in self.__dict__:
+            raise AttributeError('Operation group is sealed, use `_spawn` to get a modified copy')
+        super(SealedOperationGroup, self).__setattr__(key, value)
+
+    @property
+    def contents(self) -> list:
+        # a copy every time, so that payloads built from the contents cannot alter the sealed group
+        return deepcopy(self._contents)
+
+    @contents.setter
+    def contents(self, value):
+        self.__dict__['_contents'] = deepcopy(value)
+
+    def __repr__(self):
+        res = [
+            super(SealedOperationGroup, self).__repr__(),
+            '\nHash',
+            self._hash
+        ]
+        return '\n'.join(res)
+
+    def forge(self, validate=True):
+        """
+        Get forged operation group (without signature).
+        :param validate: Forge remotely also and compare results (only if it has not been done yet), default is True
+        :return: Hex string
+        """
+        if validate and not self._validated:
+            super(SealedOperationGroup, self).forge(validate=True)
+            self.__dict__['_validated'] = True
+        return self._forged.hex()
+
+    def binary_payload(self) -> bytes:
+        """
+        Get binary payload used for injection/hash calculation.
+        :return: bytes
+        """
+        return self._binary_payload
+
+    def hash(self):
+        """
+        Get the Base58 encoded operation group hash.
+        :return: str
+        """
+        return self._hash
@@ -4,7 +4,6 @@ import tarfile
 import netstruct
 import requests
 import simplejson as json
-from tqdm import tqdm
 from binascii import hexlify
 from collections import OrderedDict
 from tempfile import TemporaryDirectory
@@ -50,6 +49,7 @@ def tar_to_files(path=None, raw=None) -> List[Tuple[str, str]]:
 
 
 def url_to_files(url) -> List[Tuple[str, str]]:
+    from tqdm import tqdm
     res = requests.get(url, stream=True)
     raw = b''
 
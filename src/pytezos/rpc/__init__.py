@@ -1,18 +1,68 @@
+from importlib import import_module
+
 from pytezos.rpc.shell import *
 from pytezos.rpc.protocol import *
 from pytezos.rpc.helpers import *
 from pytezos.rpc.search import *
 from pytezos.rpc.node import RpcNode
+from pytezos.rpc.cache import RpcCache, TtlPolicy
+from pytezos.rpc.metrics import RpcMetrics
+from pytezos.rpc.retry import RetryPolicy, CircuitBreaker, CircuitOpenError
+
+lazy_imports = {
+    'DiskCache': 'pytezos.rpc.diskcache',
+    'ChainIndexer': 'pytezos.rpc.indexer',
+    'AsyncRpcNode': 'pytezos.rpc.aio',
+    'BalancedRpcNode': 'pytezos.rpc.balancer',
+    'MonitorStream': 'pytezos.rpc.monitor',
+    'AsyncMonitorStream': 'pytezos.rpc.monitor',
+    'HeadTracker': 'pytezos.rpc.tracker',
+    'ChainContext': 'pytezos.rpc.snapshot',
+    'MempoolWatcher': 'pytezos.rpc.mempool',
+    'CounterManager': 'pytezos.rpc.counter',
+    'Cassette': 'pytezos.rpc.cassette',
+}
+
+
+def __getattr__(name):
+    """
+    Import optional components (sqlite3, gzip, asyncio, threads) on first access, names are the same.
+    """
+    if name in lazy_imports:
+        return getattr(import_module(lazy_imports[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class RpcProvider:
 
     def __init__(self, **urls):
+        """
+        :param urls: Network name to RPC node address mapping, use a list of addresses for load balancing
+        """
         self.urls = urls
 
+    def _make_node(self, network, **kwargs) -> RpcNode:
+        uri = self.urls[network]
+        if isinstance(uri, list):
+            from pytezos.rpc.balancer import BalancedRpcNode
+            return BalancedRpcNode(uris=uri, network=network, **kwargs)
+        return RpcNode(uri=uri, network=network, **kwargs)
+
     @lru_cache(maxsize=None)
     def __getattr__(self, network) -> ShellQuery:
-        return ShellQuery(node=RpcNode(uri=self.urls[network], network=network))
+        return ShellQuery(node=self._make_node(network))
+
+    def cassette(self, network, path, mode='replay', latency=None) -> ShellQuery:
+        """
+        Get shell which records requests to a file or replays them without touching the network,
+        e.g. `pytezos.using(shell=tzkt.cassette('mainnet', 'listener.jsonl.gz'))`.
+        :param network: Network name
+        :param path: Cassette file
+        :param mode: `record`, `replay`, or `auto` (see `Cassette`)
+        :param latency: Simulated latency in replay mode (see `Cassette`)
+        """
+        from pytezos.rpc.cassette import Cassette
+        return ShellQuery(node=self._make_node(network, cassette=Cassette(path, mode=mode, latency=latency)))
 
     def __dir__(self):
         return list(super(RpcProvider, self).__dir__()) + list(self.urls.keys())
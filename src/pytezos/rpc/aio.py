@@ -0,0 +1,239 @@
+import asyncio
+from json import JSONDecodeError, loads
+from hashlib import sha1
+from time import monotonic
+from urllib.parse import urlencode
+from loguru import logger
+
+from pytezos.rpc.node import RpcError, urljoin
+from pytezos.rpc.cache import RpcCache, missing
+from pytezos.rpc.flight import AsyncSingleFlight
+from pytezos.rpc.metrics import RpcMetrics, path_template
+from pytezos.rpc.retry import RetryPolicy, CircuitBreaker, transient_statuses
+
+
+def encode_params(params) -> list:
+    """
+    Convert query parameters the same way `requests` does: skip None values, expand lists.
+    """
+    res = list()
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            res.append((key, str(item)))
+    return res
+
+
+class AsyncRpcNode:
+    """
+    Asyncio counterpart of `RpcNode` (requires `aiohttp`).
+    Can be used with the same query tree, every RPC call returns an awaitable:
+    >>> shell = ShellQuery(node=AsyncRpcNode('https://rpc.tzkt.io/mainnet/'))
+    >>> await shell.blocks[123].header()
+    Helpers combining several RPC calls (e.g. `.level()`, `.count()`) are not supported in async mode.
+    """
+
+    def __init__(self, uri, network='', cache=None, concurrency=16, pool_size=100, metrics=None,
+                 retry_policy=None, circuit_breaker=None):
+        """
+        :param uri: RPC node address
+        :param network: Network name (optional)
+        :param cache: Response cache, default is `RpcCache()`
+        :param concurrency: Max number of simultaneous requests, default is 16
+        :param pool_size: Max number of open connections, default is 100
+        :param metrics: Request metrics collector, default is `RpcMetrics()` (can be shared between nodes)
+        :param retry_policy: Re-send idempotent requests on transient failures, default is `RetryPolicy()`,
+        set False to disable
+        :param circuit_breaker: Fail fast while the node is down, default is `CircuitBreaker()`, set False to disable
+        """
+        self.uri = uri
+        self.network = network
+        self.metrics = metrics if metrics is not None else RpcMetrics()
+        self.concurrency = concurrency
+        self.pool_size = pool_size
+        self._cache = cache if cache is not None else RpcCache()
+        self._retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self._circuit_breaker = CircuitBreaker() if circuit_breaker is None else circuit_breaker
+        self._flight = AsyncSingleFlight()
+        self._session = None
+        self._semaphore = None
+
+    def __repr__(self):
+        res = [
+            super(AsyncRpcNode, self).__repr__(),
+            '\nNode address',
+            f'{self.uri} ({self.network})',
+            '\nConcurrency',
+            f'{self.concurrency} requests, {self.pool_size} connections',
+            '\nCache',
+            *list(map(lambda x: f'{x[0]}: {x[1]}', self._cache.stats().items()))
+        ]
+        return '\n'.join(res)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                headers={
+                    'content-type': 'application/json',
+                    'user-agent': 'PyTezos'
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def close(self):
+        """
+        Close all pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def cache_stats(self) -> dict:
+        """
+        Get response cache counters: hits, misses, evictions, size.
+        """
+        return self._cache.stats()
+
+    async def _attempt(self, method, path, template, params, json, timeout) -> (int, str, str):
+        import aiohttp
+        session = self._get_session()
+        async with self._semaphore:
+            started_at = monotonic()
+            try:
+                async with session.request(
+                        method=method,
+                        url=urljoin(self.uri, path),
+                        params=encode_params(params),
+                        json=json,
+                        timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+                    body = await res.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.metrics.observe(method, template, 'error', monotonic() - started_at)
+                raise
+
+        self.metrics.observe(method, template, res.status, monotonic() - started_at, len(body))
+        return res.status, body.decode(res.get_encoding()), res.content_type
+
+    async def request(self, method, path, params=None, json=None, timeout=None, template=None) -> (str, str):
+        """
+        Send request (with retries if it's idempotent), read the whole response and record metrics.
+        :param template: Path template used for metrics, derived from the path if not set
+        :return: Response text and content type
+        """
+        import aiohttp
+        template = template or path_template(path)
+        retryable = self._retry_policy and self._retry_policy.is_retryable(method, path)
+        statuses = self._retry_policy.statuses if self._retry_policy else transient_statuses
+        if self._circuit_breaker:
+            self._circuit_breaker.check()
+
+        transient, started_at, attempt = True, monotonic(), 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    status, text, content_type = await self._attempt(method, path, template, params, json, timeout)
+                    transient = status in statuses
+                    if not transient:
+                        break
+                    error = None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+
+                delay = self._retry_policy.next_delay(attempt, started_at) if retryable else None
+                if delay is None:
+                    if error is not None:
+                        raise error
+                    break
+
+                logger.debug(f'retrying {method} {path} in {delay:.2f}s ({error or status})')
+                await asyncio.sleep(delay)
+        finally:
+            if self._circuit_breaker:
+                if transient:
+                    self._circuit_breaker.failure()
+                else:
+                    self._circuit_breaker.success()
+
+        if status != 200:
+            raise RpcError.from_text(text, content_type=content_type) from None
+
+        return text, content_type
+
+    def _cache_get(self, key, template):
+        res = self._cache.get(key, missing)
+        self.metrics.cache_lookup(template, hit=res is not missing)
+        return res
+
+    async def get(self, path, params=None, caching=False, cache_key=None, timeout=None, template=None):
+        request_key = path
+        if params:
+            request_key += f'?{urlencode(params)}'
+        template = template or path_template(path)
+
+        if caching:
+            cache_key = cache_key or request_key
+            res = self._cache_get(cache_key, template)
+            if res is not missing:
+                return res
+
+        async def fetch():
+            text, _ = await self.request('GET', path, params=params, timeout=timeout, template=template)
+            res = loads(text)
+            if caching:
+                self._cache.put(cache_key, res, size=len(text), path=path)
+            return res
+
+        return await self._flight(('GET', request_key), fetch)
+
+    async def post(self, path, params=None, json=None, caching=False, template=None):
+        request_key = sha1((path + str(params) + str(json)).encode()).hexdigest()
+        template = template or path_template(path)
+
+        if caching:
+            res = self._cache_get(request_key, template)
+            if res is not missing:
+                return res
+
+        async def fetch():
+            text, _ = await self.request('POST', path, params=params, json=json, template=template)
+            try:
+                res = loads(text)
+            except JSONDecodeError:
+                res = text
+
+            if caching:
+                self._cache.put(request_key, res, size=len(text), path=path)
+            return res
+
+        return await self._flight(('POST', request_key), fetch)
+
+    def monitor(self, path, params=None, timeout=None, **kwargs):
+        """
+        Subscribe to a streaming RPC, reconnects automatically.
+        :param path: RPC path
+        :param params: Query parameters
+        :param timeout: Read timeout in seconds
+        :param kwargs: See `MonitorStream`
+        :return: Async iterable (lazy)
+        """
+        from pytezos.rpc.monitor import AsyncMonitorStream
+        return AsyncMonitorStream(self, path, params=params, timeout=timeout, **kwargs)
+
+    async def delete(self, path, params=None, template=None):
+        text, _ = await self.request('DELETE', path, params=params, template=template)
+        return loads(text)
+
+    async def put(self, path, params=None, template=None):
+        text, _ = await self.request('PUT', path, params=params, template=template)
+        return loads(text)
@@ -0,0 +1,161 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
+from time import monotonic
+from loguru import logger
+
+from pytezos.rpc.node import RpcNode, urljoin
+
+unavailable_statuses = {502, 503, 504}
+
+
+class Endpoint:
+
+    def __init__(self, uri, alpha=0.2):
+        """
+        :param uri: RPC node address
+        :param alpha: Smoothing factor of the latency moving average
+        """
+        self.uri = uri
+        self.alpha = alpha
+        self.latency = None
+        self.failures = 0
+        self.ejected_until = 0.
+        self._lock = Lock()
+
+    def __repr__(self):
+        latency = f'{self.latency * 1000:.0f}ms' if self.latency is not None else 'n/a'
+        status = 'ejected' if self.is_ejected() else 'healthy'
+        return f'{self.uri}  # {status}, {latency}, {self.failures} failures'
+
+    def is_ejected(self, now=None) -> bool:
+        return self.ejected_until > (now or monotonic())
+
+    def record_success(self, elapsed):
+        with self._lock:
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency = self.alpha * elapsed + (1 - self.alpha) * self.latency
+            self.failures = 0
+            self.ejected_until = 0.
+
+    def record_failure(self, backoff, max_backoff):
+        with self._lock:
+            self.failures += 1
+            self.ejected_until = monotonic() + min(max_backoff, backoff * 2 ** (self.failures - 1))
+
+
+class BalancedRpcNode(RpcNode):
+    """
+    RPC node backed by several endpoints.
+    Reads go to the healthy endpoint with the lowest moving average latency (endpoints without stats are probed first),
+    injections go to the preferred endpoint. Failing endpoints are ejected and re-probed after exponential backoff.
+    """
+
+    def __init__(self, uris: list, network='', preferred=None, hedge_after=None,
+                 backoff=1., max_backoff=60., cache=None, metrics=None, cassette=None,
+                 retry_policy=None, circuit_breaker=None, indexer=None):
+        """
+        :param uris: List of RPC node addresses
+        :param network: Network name (optional)
+        :param preferred: Address used for injections, default is the first one
+        :param hedge_after: Send a duplicate GET request to the next best endpoint if there is no response
+        after this number of seconds (disabled by default)
+        :param backoff: Initial ejection period in seconds, doubled on every subsequent failure
+        :param max_backoff: Max ejection period in seconds
+        :param cache: Response cache, default is `RpcCache()`
+        :param metrics: Request metrics collector, default is `RpcMetrics()`
+        :param cassette: Record or replay requests (see `Cassette`)
+        :param retry_policy: Retries on top of endpoint failover, default is `RetryPolicy()`, set False to disable
+        :param circuit_breaker: Fail fast while all endpoints are down, default is `CircuitBreaker()`
+        :param indexer: Local chain index consulted by `find_operation` (see `ChainIndexer`)
+        """
+        assert uris, 'At least one endpoint expected'
+        super(BalancedRpcNode, self).__init__(uri=preferred or uris[0], network=network, cache=cache,
+                                              metrics=metrics, cassette=cassette, retry_policy=retry_policy,
+                                              circuit_breaker=circuit_breaker, indexer=indexer)
+        self.endpoints = [Endpoint(uri) for uri in uris]
+        self.hedge_after = hedge_after
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(uris)) if hedge_after else None
+
+    def __repr__(self):
+        res = [
+            super(BalancedRpcNode, self).__repr__(),
+            '\nEndpoints',
+            *list(map(repr, self.endpoints))
+        ]
+        return '\n'.join(res)
+
+    def _candidates(self, path) -> list:
+        now = monotonic()
+        healthy = [x for x in self.endpoints if not x.is_ejected(now)]
+        ejected = sorted(filter(lambda x: x.is_ejected(now), self.endpoints), key=lambda x: x.ejected_until)
+
+        if path.strip('/').startswith('injection'):
+            healthy.sort(key=lambda x: x.uri != self.uri)
+        else:
+            healthy.sort(key=lambda x: x.latency or 0)
+
+        return healthy + ejected
+
+    def _send(self, endpoint: Endpoint, method, path, **kwargs) -> requests.Response:
+        started_at = monotonic()
+        try:
+            res = self._session.request(
+                method=method,
+                url=urljoin(endpoint.uri, path),
+                headers={
+                    'content-type': 'application/json',
+                    'user-agent': 'PyTezos'
+                },
+                **kwargs
+            )
+            if res.status_code in unavailable_statuses:
+                raise requests.HTTPError(f'{res.status_code} {res.reason}', response=res)
+        except requests.RequestException as e:
+            endpoint.record_failure(self.backoff, self.max_backoff)
+            logger.debug(f'{endpoint.uri} ejected: {e}')
+            raise
+
+        endpoint.record_success(monotonic() - started_at)
+        return res
+
+    def _hedged(self, candidates, method, path, **kwargs) -> requests.Response:
+        pending = {self._executor.submit(self._send, candidates[0], method, path, **kwargs)}
+        candidates = candidates[1:]
+        done, _ = wait(pending, timeout=self.hedge_after)
+        if not done and candidates:
+            logger.debug(f'hedging {method} {path} to {candidates[0].uri}')
+            pending.add(self._executor.submit(self._send, candidates[0], method, path, **kwargs))
+            candidates = candidates[1:]
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except requests.RequestException as e:
+                    error = e
+
+        if candidates:
+            return self._sequential(candidates, method, path, **kwargs)
+        raise error
+
+    def _sequential(self, candidates, method, path, **kwargs) -> requests.Response:
+        error = None
+        for endpoint in candidates:
+            try:
+                return self._send(endpoint, method, path, **kwargs)
+            except requests.RequestException as e:
+                error = e
+        raise error
+
+    def _request(self, method, path, **kwargs) -> requests.Response:
+        candidates = self._candidates(path)
+        if self._executor and method == 'GET' and not kwargs.get('stream') and len(candidates) > 1:
+            return self._hedged(candidates, method, path, **kwargs)
+        return self._sequential(candidates, method, path, **kwargs)
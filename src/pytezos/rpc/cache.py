@@ -0,0 +1,132 @@
+import re
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+missing = object()
+
+block_hash_path = re.compile(r'/blocks/B[1-9A-HJ-NP-Za-km-z]{50}(/|$)')
+head_relative_path = re.compile(r'/blocks/head([~+-][0-9]+)?(/|$)')
+
+
+class TtlPolicy:
+    """
+    Maps RPC path to the entry lifetime (seconds, None means no expiration).
+    Hash-addressed block paths never change, `head`-relative paths become stale as soon as a new block arrives.
+    """
+
+    def __init__(self, immutable=24 * 3600, head=5, default=60):
+        self.immutable = immutable
+        self.head = head
+        self.default = default
+
+    def __call__(self, path: str):
+        if block_hash_path.search(path):
+            return self.immutable
+        if head_relative_path.search(path):
+            return self.head
+        return self.default
+
+
+class RpcCache:
+    """
+    Thread-safe LRU cache for RPC responses with size (bytes) limit and per-entry TTL.
+    Any object implementing `get(key, default)`, `put(key, value, size, path)`, `clear()` and `stats()`
+    can be passed to `RpcNode` instead.
+    """
+
+    def __init__(self, max_size=64 * 2 ** 20, ttl_policy=None):
+        """
+        :param max_size: Total size of cached responses (bytes), default is 64MB
+        :param ttl_policy: Callable returning TTL for a given path, default is `TtlPolicy()`
+        """
+        self.max_size = max_size
+        self.ttl_policy = ttl_policy or TtlPolicy()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __repr__(self):
+        res = [
+            super(RpcCache, self).__repr__(),
+            '\nStatistics',
+            *list(map(lambda x: f'{x[0]}: {x[1]}', self.stats().items()))
+        ]
+        return '\n'.join(res)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _pop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def get(self, key, default=None):
+        """
+        Get cached value and mark it as recently used.
+        :param key: Cache key
+        :param default: Returned in case of miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= monotonic():
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size, path=None):
+        """
+        Add value to the cache, evict least recently used entries if necessary.
+        :param key: Cache key
+        :param value: Decoded response
+        :param size: Response size in bytes
+        :param path: RPC path used to determine TTL, default is the key itself
+        """
+        ttl = self.ttl_policy(path or key)
+        if ttl is not None and ttl <= 0 or size > self.max_size:
+            return
+
+        expires_at = monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+            while self._entries and self.size + size > self.max_size:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+            self._entries[key] = (value, size, expires_at)
+            self.size += size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache counters: hits, misses, evictions, expirations, current entry count and size.
+        """
+        return {
+            'entries': len(self._entries),
+            'size': self.size,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
@@ -0,0 +1,198 @@
+import gzip
+import io
+import requests
+from hashlib import sha1
+from json import dumps, loads
+from os import makedirs
+from os.path import dirname, exists, expanduser
+from threading import Lock
+from time import monotonic, sleep
+from urllib.parse import urlencode
+
+modes = ('record', 'replay', 'auto')
+
+
+def make_key(method, path, params=None, json_body=None) -> str:
+    query = sorted(
+        (key, str(item))
+        for key, value in (params or {}).items() if value is not None
+        for item in (value if isinstance(value, (list, tuple)) else [value])
+    )
+    key = f'{method} /{path.strip("/")}'
+    if query:
+        key += f'?{urlencode(query)}'
+    if json_body is not None:
+        key += '#' + sha1(dumps(json_body, sort_keys=True).encode()).hexdigest()
+    return key
+
+
+def make_response(entry: dict) -> requests.Response:
+    """
+    Fabricate response object from the cassette entry.
+    """
+    res = requests.Response()
+    res.status_code = entry['status']
+    res.reason = 'Replayed'
+    res.headers['content-type'] = entry['content_type']
+    res.encoding = 'utf-8'
+    res.raw = io.BytesIO(entry['content'].encode())
+    res.url = entry['key']
+    return res
+
+
+class Cassette:
+    """
+    Records RPC request/response pairs to a compact file (gzipped JSON lines) and replays them deterministically.
+    Identical requests are replayed in the recorded order, the last response is repeated when the sequence is over.
+    """
+
+    def __init__(self, path, mode='replay', latency=None):
+        """
+        :param path: Cassette file, e.g. `find_operation.jsonl.gz`
+        :param mode: `record` (always send, overwrite the file), `replay` (never send),
+        or `auto` (replay if recorded, send and append otherwise)
+        :param latency: Simulated latency in replay mode: None (no delay), number of seconds, `recorded`,
+        or function (method, path, recorded_latency) returning seconds
+        """
+        assert mode in modes, f'Mode should be one of {modes}'
+        self.path = expanduser(path)
+        self.mode = mode
+        self.latency = latency
+        self.played = 0
+        self.recorded = 0
+        self._entries = dict()
+        self._cursors = dict()
+        self._lock = Lock()
+        self._file = None
+
+        if mode == 'record' or not exists(self.path):
+            assert mode != 'replay', f'Cassette {self.path} not found'
+            makedirs(dirname(self.path) or '.', exist_ok=True)
+        else:
+            self.load()
+
+    def __repr__(self):
+        res = [
+            super(Cassette, self).__repr__(),
+            '\nFile',
+            f'{self.path} ({self.mode})',
+            '\nStatistics',
+            f'entries: {sum(map(len, self._entries.values()))}',
+            f'played: {self.played}',
+            f'recorded: {self.recorded}'
+        ]
+        return '\n'.join(res)
+
+    def load(self):
+        with gzip.open(self.path, 'rt') as f:
+            try:
+                for line in f:
+                    entry = loads(line)
+                    self._entries.setdefault(entry['key'], []).append(entry)
+            except (EOFError, ValueError):
+                pass  # recording was interrupted, the last entry is incomplete
+
+    def close(self):
+        """
+        Finalize the cassette file (entries are flushed on every write anyway).
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _delay(self, entry) -> float:
+        if self.latency is None:
+            return 0.
+        if self.latency == 'recorded':
+            return entry['elapsed']
+        if callable(self.latency):
+            return self.latency(entry['method'], entry['path'], entry['elapsed'])
+        return float(self.latency)
+
+    def play(self, key):
+        """
+        Get next recorded response for the request key.
+        :param key: Request key
+        :return: Response or None
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.played += 1
+
+        entry = entries[min(cursor, len(entries) - 1)]
+        delay = self._delay(entry)
+        if delay > 0:
+            sleep(delay)
+        return make_response(entry)
+
+    def write(self, key, method, path, status, content_type, content: bytes, elapsed):
+        entry = {
+            'key': key,
+            'method': method,
+            'path': path,
+            'status': status,
+            'content_type': content_type,
+            'content': content.decode(),
+            'elapsed': round(elapsed, 6)
+        }
+        with self._lock:
+            if self._file is None:
+                # appended gzip members are read as a single stream
+                self._file = gzip.open(self.path, 'wt' if self.mode == 'record' and not self.recorded else 'at')
+            self._file.write(dumps(entry) + '\n')
+            self._file.flush()
+            if self.mode == 'auto':
+                self._entries.setdefault(key, []).append(entry)
+                self._cursors[key] = len(self._entries[key])
+            self.recorded += 1
+
+    def record(self, key, method, path, res: requests.Response, elapsed, stream=False):
+        """
+        Save response to the cassette. Streamed responses are saved on close with the content consumed so far.
+        """
+        content_type = res.headers.get('content-type')
+        if stream:
+            chunks, iter_content, close = [], res.iter_content, res.close
+
+            def recording_iter_content(*args, **kwargs):
+                for chunk in iter_content(*args, **kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+
+            def recording_close():
+                close()
+                self.write(key, method, path, res.status_code, content_type, b''.join(chunks), elapsed)
+
+            res.iter_content = recording_iter_content
+            res.close = recording_close
+        else:
+            self.write(key, method, path, res.status_code, content_type, res.content, elapsed)
+
+    def __call__(self, send, method, path, params=None, json=None, **kwargs) -> requests.Response:
+        """
+        Replay or send and record request.
+        :param send: Transport function (method, path, **kwargs)
+        """
+        key = make_key(method, path, params, json)
+        if self.mode != 'record':
+            res = self.play(key)
+            if res is not None:
+                return res
+            if self.mode == 'replay':
+                raise KeyError(f'{key} is not recorded in {self.path}')
+
+        started_at = monotonic()
+        res = send(method, path, params=params, json=json, **kwargs)
+        self.record(key, method, path, res, monotonic() - started_at, stream=kwargs.get('stream', False))
+        return res
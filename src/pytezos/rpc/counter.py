@@ -0,0 +1,259 @@
+from threading import Lock, RLock
+from time import monotonic
+from loguru import logger
+
+managers_lock = Lock()
+
+
+class CounterManager:
+    """
+    Hands out counters of manager operations locally when signing, so that many operation groups signed by the
+    same key can be in flight at the same time. Injected groups are tracked until their counters are consumed
+    on chain; if a group is refused, delayed, or outdated the counter is resynchronized with the node (with the
+    groups following it dropped, since they cannot be included anymore).
+    Use `shell.counter_manager` to get the manager shared by all shells of the same node.
+    """
+    failed_statuses = ['refused', 'branch_refused', 'branch_delayed']
+
+    def __init__(self, shell, ttl=60, check_interval=10., reservation_timeout=60.):
+        """
+        :param shell: ShellQuery instance
+        :param ttl: Max number of blocks an operation group stays valid (`max_operations_ttl`)
+        :param check_interval: Check pending groups against the node at most once per this number of seconds
+        :param reservation_timeout: Seconds after which a counter that was handed out but never injected
+        is released
+        """
+        self.shell = shell
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.reservation_timeout = reservation_timeout
+        self.resyncs = 0
+        self._sources = dict()
+        self._lock = RLock()
+
+    @classmethod
+    def shared(cls, shell, **kwargs) -> 'CounterManager':
+        """
+        Get counter manager for the node of the given shell, create if not exists.
+        """
+        with managers_lock:
+            # kept by the node: a weak mapping keyed by it would never release the manager, which refers to the node
+            if getattr(shell.node, '_counter_manager', None) is None:
+                shell.node._counter_manager = cls(shell, **kwargs)
+            return shell.node._counter_manager
+
+    def __repr__(self):
+        res = [
+            super(CounterManager, self).__repr__(),
+            '\nCounters',
+            *list(map(lambda x: f'{x[0]}: {x[1]["counter"]} ({len(x[1]["pending"])} pending)',
+                      self._sources.items())),
+            '\nStatistics',
+            f'resyncs: {self.resyncs}'
+        ]
+        return '\n'.join(res)
+
+    def _get_state(self, source) -> dict:
+        if source not in self._sources:
+            self._sources[source] = {
+                'counter': None,  # last counter handed out
+                'head_counter': None,
+                'head_counter_at': None,  # time the head counter was read
+                'pending': dict(),  # operation group hash => {counters, level}
+                'reserved': dict(),  # counter => time handed out
+                'checked_at': None
+            }
+        return self._sources[source]
+
+    def _get_mempool_statuses(self) -> dict:
+        statuses = dict()
+        for status, operations in self.shell.mempool.pending_operations().items():
+            for operation in operations:
+                operation_hash = operation['hash'] if isinstance(operation, dict) else operation[0]
+                statuses[operation_hash] = status
+        return statuses
+
+    def head_counter(self, source) -> int:
+        """
+        Read the counter of the source at the head (e.g. to fill an operation group), so that simulation and
+        signing reuse it instead of asking the node again.
+        :param source: tz address
+        :return: int
+        """
+        head_counter = int(self.shell.contracts[source].counter())
+        now = monotonic()
+        with self._lock:
+            state = self._get_state(source)
+            state.update(head_counter=head_counter, head_counter_at=now)
+            if state['counter'] is None and not state['pending'] and not state['reserved']:
+                state.update(counter=head_counter, checked_at=now)  # nothing in flight, no need to resync
+        return head_counter
+
+    def resync(self, source) -> list:
+        """
+        Check pending operation groups and reset the local counter to the last one which can still be included.
+        :param source: tz address
+        :return: List of dropped operation group hashes (refused, delayed, outdated, or following such)
+        """
+        with self._lock:
+            has_pending = bool(self._get_state(source)['pending'])
+
+        # the node is asked without holding the lock, so that signing for other sources does not wait for it
+        # mempool first: a group included in between is then covered by the head counter
+        statuses = self._get_mempool_statuses() if has_pending else {}
+        head_counter = int(self.shell.contracts[source].counter())
+        level = self.shell.chain_context.snapshot()['level'] if has_pending else None
+        now = monotonic()
+
+        with self._lock:
+            state = self._get_state(source)
+            live = set()
+            for operation_hash, group in list(state['pending'].items()):
+                if max(group['counters']) <= head_counter:
+                    del state['pending'][operation_hash]  # included
+                elif statuses.get(operation_hash) not in self.failed_statuses \
+                        and (level is None or group['level'] + self.ttl > level):
+                    # a missing one is kept: the node asked (e.g. by a balancer) may not have received it yet
+                    live.update(group['counters'])
+            for counter, reserved_at in list(state['reserved'].items()):
+                if counter <= head_counter or now - reserved_at > self.reservation_timeout:
+                    del state['reserved'][counter]
+                else:
+                    live.add(counter)
+
+            counter = head_counter
+            while counter + 1 in live:
+                counter += 1
+
+            dropped = [x for x, group in state['pending'].items() if max(group['counters']) > counter]
+            for operation_hash in dropped:
+                del state['pending'][operation_hash]
+            for reserved in [x for x in state['reserved'] if x > counter]:
+                del state['reserved'][reserved]
+            if dropped:
+                logger.warning(f'{source}: counter reset to {counter}, dropped {", ".join(dropped)}')
+
+            state.update(counter=counter, head_counter=head_counter, head_counter_at=now, checked_at=now)
+            self.resyncs += 1
+            return dropped
+
+    def reserve(self, contents) -> list:
+        """
+        Hand out counters for the contents about to be signed, the node is only asked for the first time
+        or when the check interval expires. The counters are placeholders following the head counter
+        (set by `fill`), the ones already taken by groups in flight are moved after them.
+        :param contents: Operation contents with counters (of the same source)
+        :return: list of contents
+        """
+        counters = [int(x['counter']) for x in contents if x.get('counter')]
+        if not counters:
+            return contents
+
+        source = next(x['source'] for x in contents if x.get('counter'))
+        with self._lock:
+            state = self._get_state(source)
+            expired = state['counter'] is None or monotonic() - state['checked_at'] > self.check_interval
+        if expired:
+            self.resync(source)
+
+        with self._lock:
+            offset = max(state['counter'] + 1 - min(counters), 0)
+            for counter in counters:
+                state['reserved'][counter + offset] = monotonic()
+            state['counter'] = max(state['counter'], max(counters) + offset)
+
+        if offset == 0:
+            return contents
+        return [{**x, 'counter': str(int(x['counter']) + offset)} if x.get('counter') else x for x in contents]
+
+    def check(self, contents):
+        """
+        Make sure counters set by the caller are not handed out to another group being signed, the node is not
+        asked. Counters of injected groups can be used again (e.g. to replace a stuck operation with a higher fee).
+        :param contents: Operation contents with counters (of the same source)
+        :raises ValueError: if a counter is reserved by another group
+        """
+        counters = [int(x['counter']) for x in contents if x.get('counter')]
+        if not counters:
+            return
+
+        source = next(x['source'] for x in contents if x.get('counter'))
+        with self._lock:
+            collisions = sorted(set(counters) & set(self._get_state(source)['reserved']))
+        if collisions:
+            raise ValueError(f'{source}: counters {collisions} are reserved by another operation group')
+
+    def track(self, source, operation_group_hash, counters):
+        """
+        Register injected operation group.
+        :param source: tz address
+        :param operation_group_hash: base58
+        :param counters: List of counters used by the group
+        """
+        with self._lock:
+            state = self._get_state(source)
+            for counter in counters:
+                state['reserved'].pop(counter, None)
+            state['pending'][operation_group_hash] = {
+                'counters': list(counters),
+                'level': self.shell.chain_context.snapshot()['level']
+            }
+
+    def release(self, source, counters):
+        """
+        Return counters of an operation group which is not going to be injected (e.g. failed).
+        :param source: tz address
+        :param counters: List of counters, the ones not handed out by the manager are ignored
+        """
+        with self._lock:
+            state = self._get_state(source)
+            released = [x for x in counters if state['reserved'].pop(x, None) is not None]
+            if released and state['counter'] == max(released):
+                state['counter'] = min(released) - 1
+            elif released:
+                state['checked_at'] = 0  # there is a gap now, resync on the next request
+
+    def pending(self, source) -> list:
+        """
+        Get hashes of tracked operation groups which are not included yet (as of the last check).
+        :param source: tz address
+        :return: list
+        """
+        with self._lock:
+            return list(self._get_state(source)['pending'])
+
+    def head_offset(self, contents) -> int:
+        """
+        Get the number of counters preceding the contents which are not consumed on chain yet (in flight).
+        Simulation and preapply are done against the head state, so they fail unless the offset is zero.
+        :param contents: Operation contents with counters (of the same source)
+        :return: int
+        """
+        counters = [int(x['counter']) for x in contents if x.get('counter')]
+        if not counters:
+            return 0
+
+        source = next(x['source'] for x in contents if x.get('counter'))
+        with self._lock:
+            state = self._get_state(source)
+            in_flight = set(state['reserved']).union(*[x['counters'] for x in state['pending'].values()])
+            if not any(map(lambda x: x < min(counters), in_flight - set(counters))):
+                return 0  # nothing of this source is in flight before the contents
+            head_counter, head_counter_at = state['head_counter'], state['head_counter_at']
+
+        if head_counter is None or monotonic() - head_counter_at > self.check_interval:
+            head_counter = int(self.shell.contracts[source].counter())
+            with self._lock:
+                state.update(head_counter=head_counter, head_counter_at=monotonic())
+        return max(min(counters) - head_counter - 1, 0)
+
+    def rebase(self, contents) -> list:
+        """
+        Shift counters so that they follow the head counter (for simulation).
+        :param contents: Operation contents with counters (of the same source)
+        :return: list of contents
+        """
+        offset = self.head_offset(contents)
+        if offset == 0:
+            return contents
+        return [{**x, 'counter': str(int(x['counter']) - offset)} if x.get('counter') else x for x in contents]
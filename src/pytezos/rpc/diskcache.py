@@ -0,0 +1,167 @@
+import re
+import sqlite3
+import zlib
+from json import loads
+from os import makedirs
+from os.path import expanduser, dirname
+from threading import Lock
+from time import time
+
+default_path = '~/.pytezos/rpc_cache.sqlite'
+block_path = re.compile(r'/blocks/([^/]+)(/|$)')
+block_hash = re.compile(r'^B[1-9A-HJ-NP-Za-km-z]{50}$')
+head_header_path = re.compile(r'/blocks/head/header$')
+
+
+class DiskCache:
+    """
+    Persistent SQLite cache for responses which never change: block-hash-addressed paths
+    and level-addressed paths below the finality depth. Payloads are zlib-compressed,
+    least recently used entries are pruned when the size cap is exceeded.
+    Can be shared by nodes of different networks: keys and head levels are scoped by chain ID.
+    """
+
+    def __init__(self, path=default_path, max_size=1024 * 2 ** 20, finality=60, compress_level=6):
+        """
+        :param path: SQLite database file, default is ~/.pytezos/rpc_cache.sqlite
+        :param max_size: Max total size of compressed payloads (bytes), default is 1GB
+        :param finality: Number of blocks after which a level-addressed block is considered final
+        :param compress_level: zlib compression level
+        """
+        self.path = expanduser(path)
+        self.max_size = max_size
+        self.finality = finality
+        self.compress_level = compress_level
+        self.head_levels = dict()
+        self.hits = 0
+        self.misses = 0
+
+        makedirs(dirname(self.path) or '.', exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                         'key TEXT PRIMARY KEY, path TEXT, data BLOB, size INTEGER, accessed REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self.size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def __repr__(self):
+        res = [
+            super(DiskCache, self).__repr__(),
+            '\nDatabase',
+            self.path,
+            '\nStatistics',
+            *list(map(lambda x: f'{x[0]}: {x[1]}', self.stats().items()))
+        ]
+        return '\n'.join(res)
+
+    def is_cacheable(self, path, scope='') -> bool:
+        """
+        Check if response for the given path is immutable.
+        :param path: RPC path
+        :param scope: Chain ID of the node
+        """
+        match = block_path.search(path)
+        if not match:
+            return False
+
+        block_id = match.group(1)
+        if block_hash.match(block_id):
+            return True
+        head_level = self.head_levels.get(scope)
+        if block_id.isdigit() and head_level is not None:
+            return int(block_id) <= head_level - self.finality
+        return False
+
+    def observe(self, path, value, scope=''):
+        """
+        Track current head level (used to decide whether level-addressed blocks are final).
+        :param path: RPC path
+        :param value: Decoded response
+        :param scope: Chain ID of the node
+        """
+        if head_header_path.search(path) and isinstance(value, dict) and 'level' in value:
+            self.head_levels[scope] = max(self.head_levels.get(scope, 0), value['level'])
+
+    def get(self, key, default=None):
+        """
+        Get decoded response.
+        :param key: Request key
+        :param default: Returned in case of miss
+        """
+        with self._lock:
+            row = self._db.execute('SELECT data FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time(), key))
+            self.hits += 1
+
+        return loads(zlib.decompress(row[0]))
+
+    def put(self, key, path, content: bytes):
+        """
+        Compress and store raw response.
+        :param key: Request key
+        :param path: RPC path
+        :param content: Raw JSON response
+        """
+        data = zlib.compress(content, self.compress_level)
+        if len(data) > self.max_size:
+            return
+
+        with self._lock:
+            row = self._db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                             (key, path, data, len(data), time()))
+            self.size += len(data) - (row[0] if row else 0)
+
+        if self.size > self.max_size:
+            self.prune(max_size=int(self.max_size * 0.9))
+
+    def prune(self, max_size=None, vacuum=False):
+        """
+        Delete least recently used entries until total size fits the limit.
+        :param max_size: Override size limit (bytes), default is `max_size` passed to the constructor
+        :param vacuum: Shrink database file afterwards (slow), default is False
+        :return: Number of deleted entries
+        """
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock:
+            keys = list()
+            for key, size in self._db.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                if self.size <= max_size:
+                    break
+                keys.append((key,))
+                self.size -= size
+
+            self._db.execute('BEGIN')
+            self._db.executemany('DELETE FROM entries WHERE key = ?', keys)
+            self._db.execute('COMMIT')
+            deleted = len(keys)
+
+        if vacuum:
+            self._db.execute('VACUUM')
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM entries')
+            self.size = 0
+        self._db.execute('VACUUM')
+
+    def stats(self) -> dict:
+        """
+        Get entry count, total (compressed) size, hits and misses.
+        """
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        return {
+            'entries': entries,
+            'size': self.size,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
@@ -0,0 +1,88 @@
+from threading import Event, Lock
+
+
+class InflightCall:
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls: the first caller executes the request,
+    the others wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = dict()
+        self._lock = Lock()
+
+    def __call__(self, key, func):
+        """
+        Execute `func` unless a call with the same key is already in flight.
+        :param key: Request identity (path, params, body digest)
+        :param func: Callable without arguments
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = InflightCall()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio version of `SingleFlight`, followers await the leader's future.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = dict()
+
+    async def __call__(self, key, func):
+        """
+        Await `func()` unless a call with the same key is already in flight.
+        :param key: Request identity (path, params, body digest)
+        :param func: Coroutine function without arguments
+        """
+        import asyncio
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = self._calls[key] = asyncio.get_event_loop().create_future()
+        try:
+            res = await func()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark as retrieved if nobody is waiting
+            raise
+        else:
+            future.set_result(res)
+            return res
+        finally:
+            del self._calls[key]
@@ -0,0 +1,277 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps, loads
+from os import makedirs
+from os.path import expanduser, dirname
+from threading import Lock
+from typing import Generator
+from loguru import logger
+
+default_path = '~/.pytezos/chain_index.sqlite'
+schema = [
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+    'CREATE TABLE IF NOT EXISTS blocks (level INTEGER PRIMARY KEY, hash TEXT, predecessor TEXT, timestamp TEXT, '
+    'header TEXT)',
+    'CREATE TABLE IF NOT EXISTS operations (hash TEXT, level INTEGER, validation_pass INTEGER, op_index INTEGER)',
+    'CREATE TABLE IF NOT EXISTS contents (hash TEXT, level INTEGER, validation_pass INTEGER, op_index INTEGER, '
+    'content_index INTEGER, internal_index INTEGER, kind TEXT, source TEXT, destination TEXT, entrypoint TEXT, '
+    'amount TEXT, status TEXT, content TEXT)',
+    'CREATE INDEX IF NOT EXISTS operations_hash ON operations (hash)',
+    'CREATE INDEX IF NOT EXISTS operations_level ON operations (level)',
+    'CREATE INDEX IF NOT EXISTS contents_hash ON contents (hash)',
+    'CREATE INDEX IF NOT EXISTS contents_level ON contents (level)',
+    'CREATE INDEX IF NOT EXISTS contents_source ON contents (source, level)',
+    'CREATE INDEX IF NOT EXISTS contents_destination ON contents (destination, entrypoint, level)',
+    'CREATE INDEX IF NOT EXISTS contents_entrypoint ON contents (entrypoint, level)',
+]
+content_columns = ('hash', 'level', 'validation_pass', 'op_index', 'content_index', 'internal_index', 'kind',
+                   'source', 'destination', 'entrypoint', 'amount', 'status', 'content')
+
+
+def make_content_row(content: dict, result: dict, **location) -> tuple:
+    if content['kind'] == 'origination':
+        destination = next(iter(result.get('originated_contracts', [])), None)
+    elif content['kind'] == 'delegation':
+        destination = content.get('delegate')
+    else:
+        destination = content.get('destination')
+
+    entrypoint = None
+    if content.get('parameters'):
+        entrypoint = content['parameters'].get('entrypoint', 'default')
+
+    row = dict(
+        **location,
+        kind=content['kind'],
+        source=content.get('source'),
+        destination=destination,
+        entrypoint=entrypoint,
+        amount=content.get('amount'),
+        status=result.get('status'),
+        content=dumps(content)
+    )
+    return tuple(row[x] for x in content_columns)
+
+
+def iter_block_rows(block: dict) -> Generator:
+    """
+    Flatten block operations.
+    :param block: Block with operations and metadata
+    :return: Generator of ('operations', row) and ('contents', row) tuples
+    """
+    level = block['header']['level']
+    for validation_pass, operations in enumerate(block['operations']):
+        for op_index, operation in enumerate(operations):
+            yield 'operations', (operation['hash'], level, validation_pass, op_index)
+            if validation_pass != 3:
+                continue
+
+            for content_index, content in enumerate(operation['contents']):
+                metadata = content.get('metadata', {})
+                location = dict(hash=operation['hash'], level=level, validation_pass=validation_pass,
+                                op_index=op_index, content_index=content_index)
+                yield 'contents', make_content_row(
+                    content, metadata.get('operation_result', {}), **location, internal_index=None)
+                for internal_index, internal in enumerate(metadata.get('internal_operation_results', [])):
+                    yield 'contents', make_content_row(
+                        internal, internal.get('result', {}), **location, internal_index=internal_index)
+
+
+class ChainIndexer:
+    """
+    Local SQLite index of block headers, operation hashes, and manager operations (including internal ones)
+    with their results. Filled incrementally by `sync`, answers lookups by operation hash, source, destination,
+    and entrypoint without touching the node. Pass it to `RpcNode(indexer=...)` to speed up `find_operation`.
+    """
+
+    def __init__(self, path=default_path):
+        """
+        :param path: SQLite database file, default is ~/.pytezos/chain_index.sqlite (one file per network)
+        """
+        self.path = expanduser(path)
+        makedirs(dirname(self.path) or '.', exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        for statement in schema:
+            self._db.execute(statement)
+
+    def __repr__(self):
+        res = [
+            super(ChainIndexer, self).__repr__(),
+            '\nDatabase',
+            self.path,
+            '\nStatistics',
+            *list(map(lambda x: f'{x[0]}: {x[1]}', self.stats().items()))
+        ]
+        return '\n'.join(res)
+
+    def _query(self, sql, *args) -> list:
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def stats(self) -> dict:
+        return {
+            'chain_id': self._get_meta('chain_id'),
+            'first_level': self._query('SELECT MIN(level) FROM blocks')[0][0],
+            'last_level': self.level(),
+            'operations': self._query('SELECT COUNT(*) FROM operations')[0][0],
+            'contents': self._query('SELECT COUNT(*) FROM contents')[0][0]
+        }
+
+    def _get_meta(self, key):
+        rows = self._query('SELECT value FROM meta WHERE key = ?', key)
+        return rows[0][0] if rows else None
+
+    def level(self):
+        """
+        Get last indexed level.
+        :return: int or None if the index is empty
+        """
+        return self._query('SELECT MAX(level) FROM blocks')[0][0]
+
+    def block_hash(self, level):
+        rows = self._query('SELECT hash FROM blocks WHERE level = ?', level)
+        return rows[0][0] if rows else None
+
+    def ingest(self, blocks: list) -> int:
+        """
+        Save consecutive blocks in a single transaction. If a block does not link to the indexed predecessor
+        (chain reorganization) the predecessor is discarded and has to be indexed again.
+        :param blocks: List of blocks with operations and metadata, ascending
+        :return: Next level to index
+        """
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                for block in blocks:
+                    header = block['header']
+                    level = header['level']
+                    row = self._db.execute('SELECT hash FROM blocks WHERE level = ?', (level - 1,)).fetchone()
+                    if row is not None and row[0] != header['predecessor']:
+                        logger.info(f'reorganization at level {level - 1}, re-indexing')
+                        self._rollback(level - 1)
+                        self._db.execute('COMMIT')
+                        return level - 1
+
+                    self._rollback(level)
+                    self._db.execute('INSERT INTO blocks VALUES (?, ?, ?, ?, ?)',
+                                     (level, block['hash'], header['predecessor'], header['timestamp'],
+                                      dumps(header)))
+                    rows = {'operations': [], 'contents': []}
+                    for table, row in iter_block_rows(block):
+                        rows[table].append(row)
+                    self._db.executemany('INSERT INTO operations VALUES (?, ?, ?, ?)', rows['operations'])
+                    self._db.executemany(f'INSERT INTO contents VALUES ({", ".join("?" * len(content_columns))})',
+                                         rows['contents'])
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+        return blocks[-1]['header']['level'] + 1 if blocks else None
+
+    def _rollback(self, level):
+        for table in ['blocks', 'operations', 'contents']:
+            self._db.execute(f'DELETE FROM {table} WHERE level >= ?', (level,))
+
+    def sync(self, shell, start=1, head=None, finality=0, batch=100, max_workers=8) -> int:
+        """
+        Index blocks from the last indexed level (or `start` if the index is empty) up to the head.
+        :param shell: Shell query, e.g. `mainnet`
+        :param start: First level to index if the index is empty
+        :param head: Last level to index, default is the current head level
+        :param finality: Do not index this number of most recent blocks (which may be reorganized)
+        :param batch: Number of blocks fetched concurrently and saved in one transaction
+        :param max_workers: Max number of concurrent requests
+        :return: Last indexed level
+        """
+        header = shell.head.header()
+        chain_id = self._get_meta('chain_id')
+        if chain_id is None:
+            with self._lock:
+                self._db.execute('INSERT INTO meta VALUES (?, ?)', ('chain_id', header['chain_id']))
+        else:
+            assert chain_id == header['chain_id'], f'Index {self.path} belongs to another chain {chain_id}'
+
+        if head is None:
+            head = header['level'] - finality
+        last_level = self.level()
+        level = start if last_level is None else last_level + 1
+
+        stale = 0  # levels up to this one could be cached before a reorganization
+
+        def fetch(x):
+            if x <= stale:
+                return shell.node.get(shell.blocks[x].path)  # block ids by level are cached
+            return shell.blocks[x]()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while level <= head:
+                levels = range(level, min(level + batch, head + 1))
+                blocks = list(executor.map(fetch, levels))
+                level = self.ingest(blocks)
+                if level < levels.stop:
+                    stale = max(stale, levels.stop - 1)
+                logger.debug(f'indexed up to {level - 1}')
+
+        return self.level()
+
+    def locate_operations(self, operation_group_hashes) -> dict:
+        """
+        Find locations of indexed operation groups.
+        :param operation_group_hashes: list of base58 hashes
+        :return: dict {operation_group_hash: (level, validation_pass, index)}, missing hashes are omitted
+        """
+        hashes = list(operation_group_hashes)
+        rows = self._query(f'SELECT hash, level, validation_pass, op_index FROM operations '
+                           f'WHERE hash IN ({", ".join("?" * len(hashes))})', *hashes)
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def _contents(self, where, args, limit, offset) -> list:
+        rows = self._query(f'SELECT * FROM contents WHERE {where} ORDER BY level, op_index, content_index, '
+                           f'internal_index LIMIT ? OFFSET ?', *args, -1 if limit is None else limit, offset)
+        return [dict(row, content=loads(row['content'])) for row in rows]
+
+    def transactions(self, destination, entrypoint=None, status='applied', limit=None, offset=0) -> list:
+        """
+        Find transactions (including internal ones) to the given address.
+        :param destination: Address (KT1 or tz)
+        :param entrypoint: Entrypoint name (optional)
+        :param status: Operation result status, default is `applied`, set None to get all
+        :param limit: Max number of rows
+        :param offset: Number of rows to skip
+        :return: list of dicts, sorted by level
+        """
+        where, args = "kind = 'transaction' AND destination = ?", [destination]
+        if entrypoint is not None:
+            where, args = where + ' AND entrypoint = ?', args + [entrypoint]
+        if status is not None:
+            where, args = where + ' AND status = ?', args + [status]
+        return self._contents(where, args, limit, offset)
+
+    def operations_by_source(self, source, kind=None, status=None, limit=None, offset=0) -> list:
+        """
+        Find manager operations (including internal ones) sent by the given address.
+        :param source: Address (KT1 or tz)
+        :param kind: Operation kind (optional): `reveal`, `transaction`, `origination`, `delegation`
+        :param status: Operation result status (optional)
+        :param limit: Max number of rows
+        :param offset: Number of rows to skip
+        :return: list of dicts, sorted by level
+        """
+        where, args = 'source = ?', [source]
+        if kind is not None:
+            where, args = where + ' AND kind = ?', args + [kind]
+        if status is not None:
+            where, args = where + ' AND status = ?', args + [status]
+        return self._contents(where, args, limit, offset)
+
+    def operation_contents(self, operation_group_hash) -> list:
+        """
+        Get indexed manager operations of the group.
+        :param operation_group_hash: base58
+        :return: list of dicts
+        """
+        return self._contents('hash = ?', [operation_group_hash], None, 0)
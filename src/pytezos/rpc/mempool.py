@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from time import sleep, monotonic
+from loguru import logger
+
+
+def get_entrypoints(node) -> set:
+    """
+    Get entrypoint names declared by field annotations of the `or` tree at the root of the parameter type.
+    """
+    if node.get('prim') != 'or':
+        return set()
+    res = set()
+    for arg in node['args']:
+        res.update(annot[1:] for annot in arg.get('annots', []) if annot.startswith('%'))
+        res.update(get_entrypoints(arg))
+    return res
+
+
+def to_set(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+class MempoolWatcher:
+    """
+    Lazy iterator over manager operations reaching the mempool (applied by the node), filtered by kind, source,
+    destination and entrypoint. Each operation group is reported once, no matter how many times it is seen
+    in subsequent streams or polls. Transaction parameters are decoded with the destination contract schema.
+    """
+
+    def __init__(self, shell, destination=None, kind='transaction', entrypoint=None, source=None,
+                 decode=True, mode='stream', interval=1., timeout=None, history=10000):
+        """
+        :param shell: ShellQuery instance
+        :param destination: Address or list of addresses (optional)
+        :param kind: Operation kind or list of kinds, default is `transaction`, set None to get all
+        :param entrypoint: Entrypoint name or list of names (optional)
+        :param source: Address or list of addresses (optional)
+        :param decode: Decode transaction parameters using `ContractParameter`, default is True
+        :param mode: `stream` (monitor_operations, default) or `poll` (pending_operations every `interval` seconds)
+        :param interval: Polling interval (poll mode) or min interval between stream reopens (stream mode) in seconds
+        :param timeout: Read timeout in seconds (stream mode)
+        :param history: Number of operation group hashes to remember
+        """
+        assert mode in {'stream', 'poll'}, 'Mode should be either `stream` or `poll`'
+        self.shell = shell
+        self.destination = to_set(destination)
+        self.kind = to_set(kind)
+        self.entrypoint = to_set(entrypoint)
+        self.source = to_set(source)
+        self.decode = decode
+        self.mode = mode
+        self.interval = interval
+        self.timeout = timeout
+        self.history = history
+        self._seen = OrderedDict()
+        self._parameters = dict()
+        self._stopped = False
+
+    def __repr__(self):
+        res = [
+            super(MempoolWatcher, self).__repr__(),
+            '\nFilters',
+            f'kind: {self.kind or "any"}',
+            f'source: {self.source or "any"}',
+            f'destination: {self.destination or "any"}',
+            f'entrypoint: {self.entrypoint or "any"}',
+            '\nStatistics',
+            f'seen: {len(self._seen)}'
+        ]
+        return '\n'.join(res)
+
+    def stop(self):
+        """
+        Stop iteration after the next operation.
+        """
+        self._stopped = True
+
+    def _is_new(self, operation_group_hash) -> bool:
+        if operation_group_hash in self._seen:
+            return False
+        self._seen[operation_group_hash] = None
+        if len(self._seen) > self.history:
+            self._seen.popitem(last=False)
+        return True
+
+    def _get_parameter(self, address):
+        """
+        Get `ContractParameter` of the contract and its annotated entrypoints (cached).
+        Parameter is None for implicit accounts.
+        """
+        if address not in self._parameters:
+            from pytezos.michelson.contract import ContractParameter
+
+            code = None
+            if address.startswith('KT'):
+                code = self.shell.head.context.contracts[address].code()
+            section = next((s for s in code if s['prim'] == 'parameter'), None) if code else None
+            if section is not None:
+                self._parameters[address] = ContractParameter(section), get_entrypoints(section['args'][0])
+            else:
+                self._parameters[address] = None, set()
+        return self._parameters[address]
+
+    def _decode(self, content):
+        parameters = content.get('parameters')
+        if not self.decode or not parameters:
+            return None
+        try:
+            schema, _ = self._get_parameter(content['destination'])
+            if schema is None:
+                return None
+            if parameters.get('entrypoint') in {None, 'default', 'root'}:
+                return schema.decode(parameters['value'])
+            return schema.decode(parameters)
+        except Exception as e:
+            logger.debug(f'cannot decode parameters of {content["destination"]}: {e}')
+            return None
+
+    def _match(self, operation_group, content):
+        """
+        Apply filters.
+        :return: Match (dict) or None
+        """
+        if self.kind and content['kind'] not in self.kind:
+            return None
+        if self.source and content.get('source') not in self.source:
+            return None
+        if self.destination and content.get('destination') not in self.destination:
+            return None
+
+        entrypoint = content.get('parameters', {}).get('entrypoint', 'default')
+        parameters = self._decode(content)
+        if entrypoint in {'default', 'root'} and isinstance(parameters, dict) and len(parameters) == 1:
+            _, entrypoints = self._get_parameter(content['destination'])
+            if next(iter(parameters)) in entrypoints:
+                entrypoint = next(iter(parameters))  # entrypoint implied by the parameter type annotations
+
+        if self.entrypoint and entrypoint not in self.entrypoint:
+            return None
+
+        return {
+            'hash': operation_group['hash'],
+            'branch': operation_group['branch'],
+            'entrypoint': entrypoint,
+            'parameters': parameters,
+            'content': content
+        }
+
+    def _iter_operation_groups(self):
+        while not self._stopped:
+            if self.mode == 'stream':
+                # the node closes the stream whenever the mempool is flushed (new head), or right away if it is unwell
+                opened_at = monotonic()
+                yield from self.shell.mempool.monitor_operations(
+                    applied=True, branch_delayed=False, timeout=self.timeout)
+                sleep(max(0., self.interval - (monotonic() - opened_at)))
+            else:
+                yield from self.shell.mempool.pending_operations()['applied']
+                sleep(self.interval)
+
+    def __iter__(self):
+        for operation_group in self._iter_operation_groups():
+            if not self._is_new(operation_group['hash']):
+                continue
+            for content in operation_group['contents']:
+                match = self._match(operation_group, content)
+                if match is not None:
+                    yield match
+            if self._stopped:
+                break
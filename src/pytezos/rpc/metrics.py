@@ -0,0 +1,235 @@
+import re
+from collections import defaultdict
+from threading import Lock, Thread
+
+default_buckets = (.005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10., 30.)
+path_params = [
+    (re.compile(r'/(?:[BoPNe]|tz[123]|KT1|expr)[1-9A-HJ-NP-Za-km-z]{30,}(?=/|$)'), '/{}'),
+    (re.compile(r'/-?\d+(?=/|$)'), '/{}'),
+    (re.compile(r'/(head|genesis)~\d+(?=/|$)'), '/{}'),
+]
+
+
+def path_template(path: str) -> str:
+    """
+    Replace hashes, addresses and numbers in a concrete RPC path with placeholders
+    (used when the query template is unknown).
+    :param path: RPC path
+    """
+    res = '/' + path.strip('/')
+    for regexp, repl in path_params:
+        res = regexp.sub(repl, res)
+    return res
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_labels(**labels) -> str:
+    return ','.join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+
+
+class Histogram:
+
+    def __init__(self, buckets=default_buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q) -> float:
+        """
+        Estimate quantile (upper bound of the bucket containing it).
+        :param q: 0..1
+        """
+        rank, acc = q * self.count, 0
+        for i, count in enumerate(self.counts):
+            acc += count
+            if acc >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return 0.
+
+    def cumulative(self) -> list:
+        res, acc = list(), 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            acc += count
+            res.append((bound, acc))
+        return res
+
+
+class RequestSeries:
+
+    def __init__(self, buckets):
+        self.latency = Histogram(buckets)
+        self.bytes = 0
+
+
+class RpcMetrics:
+    """
+    Request counters grouped by method, path template and status: latency histogram, response bytes,
+    cache hits and misses. Can be exported in Prometheus text format.
+    """
+
+    def __init__(self, buckets=default_buckets, prefix='pytezos_rpc'):
+        """
+        :param buckets: Latency histogram bounds in seconds
+        :param prefix: Prometheus metric name prefix
+        """
+        self.buckets = buckets
+        self.prefix = prefix
+        self._requests = dict()
+        self._cache = defaultdict(int)
+        self._lock = Lock()
+
+    def __repr__(self):
+        res = [
+            super(RpcMetrics, self).__repr__(),
+            '\nRequests',
+            *list(map(lambda x: f'{x["method"]} {x["template"]} {x["status"]}: '
+                                f'{x["count"]} requests, avg {x["avg_time"] * 1000:.0f}ms, '
+                                f'p95 {x["p95_time"] * 1000:.0f}ms, {x["bytes"]} bytes',
+                      self.stats()['requests']))
+        ]
+        return '\n'.join(res)
+
+    def observe(self, method, template, status, elapsed, size=0):
+        """
+        Record finished request.
+        :param method: HTTP method
+        :param template: Path template, e.g. `/chains/{}/blocks/{}/header`
+        :param status: HTTP status code or `error` in case of a network failure
+        :param elapsed: Latency in seconds
+        :param size: Response size in bytes
+        """
+        key = (method, template, str(status))
+        with self._lock:
+            series = self._requests.get(key)
+            if series is None:
+                series = self._requests[key] = RequestSeries(self.buckets)
+            series.latency.observe(elapsed)
+            series.bytes += size
+
+    def cache_lookup(self, template, hit: bool, cache='memory'):
+        """
+        Record cache lookup.
+        :param template: Path template
+        :param hit: Cache hit or miss
+        :param cache: Cache name: `memory` or `disk`
+        """
+        with self._lock:
+            self._cache[(template, cache, 'hit' if hit else 'miss')] += 1
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        Get per-template request and cache statistics (latency in seconds).
+        """
+        with self._lock:
+            requests = [
+                {
+                    'method': method,
+                    'template': template,
+                    'status': status,
+                    'count': series.latency.count,
+                    'total_time': series.latency.sum,
+                    'avg_time': series.latency.sum / series.latency.count,
+                    'p50_time': series.latency.quantile(0.5),
+                    'p95_time': series.latency.quantile(0.95),
+                    'bytes': series.bytes
+                }
+                for (method, template, status), series in self._requests.items()
+            ]
+            cache = defaultdict(dict)
+            for (template, name, result), count in self._cache.items():
+                cache[(template, name)][result] = count
+
+        requests.sort(key=lambda x: x['total_time'], reverse=True)
+        return {
+            'requests': requests,
+            'cache': [
+                {'template': template, 'cache': name, 'hits': res.get('hit', 0), 'misses': res.get('miss', 0)}
+                for (template, name), res in sorted(cache.items())
+            ]
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Render metrics in Prometheus text exposition format.
+        """
+        name = self.prefix
+        lines = [
+            f'# HELP {name}_request_duration_seconds RPC request latency',
+            f'# TYPE {name}_request_duration_seconds histogram'
+        ]
+        with self._lock:
+            requests = [(key, series.latency.cumulative(), series.latency.sum, series.latency.count, series.bytes)
+                        for key, series in self._requests.items()]
+            cache = list(self._cache.items())
+
+        for (method, template, status), buckets, total, count, size in requests:
+            labels = format_labels(method=method, template=template, status=status)
+            for bound, acc in buckets:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_request_duration_seconds_bucket{{{labels},le="{le}"}} {acc}')
+            lines.append(f'{name}_request_duration_seconds_sum{{{labels}}} {total}')
+            lines.append(f'{name}_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines.extend([
+            f'# HELP {name}_response_bytes_total Total size of RPC responses',
+            f'# TYPE {name}_response_bytes_total counter'
+        ])
+        for (method, template, status), _, _, _, size in requests:
+            labels = format_labels(method=method, template=template, status=status)
+            lines.append(f'{name}_response_bytes_total{{{labels}}} {size}')
+
+        lines.extend([
+            f'# HELP {name}_cache_lookups_total Response cache lookups',
+            f'# TYPE {name}_cache_lookups_total counter'
+        ])
+        for (template, cache_name, result), count in cache:
+            labels = format_labels(template=template, cache=cache_name, result=result)
+            lines.append(f'{name}_cache_lookups_total{{{labels}}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9100, addr='') -> 'ThreadingHTTPServer':
+        """
+        Expose metrics over HTTP (any path) in a background thread.
+        :param port: Port to listen on, default is 9100
+        :param addr: Interface to bind, default is all
+        :return: Server instance, call `.shutdown()` to stop
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('content-type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('content-length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), MetricsHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,170 @@
+import asyncio
+import requests
+from collections import OrderedDict
+from time import sleep
+from loguru import logger
+
+from pytezos.rpc.node import RpcError, urljoin
+from pytezos.tools.jsonstream import JsonSplitter
+
+
+class MonitorStream:
+    """
+    Lazy iterator over a long-lived streaming RPC (`/monitor/...`, `.../monitor_operations`).
+    In case of a network failure, a server error, or the stream closed by the node (or a proxy)
+    the connection is re-established with exponential backoff,
+    items that were already seen are skipped, and (optionally) the gap is filled with regular RPC calls.
+    """
+
+    def __init__(self, node, path, params=None, timeout=None, key=None, flatten=False, gap=None,
+                 reconnect=True, resume=True, backoff=1., max_backoff=30., history=10000, template=None):
+        """
+        :param node: RPC node
+        :param path: RPC path
+        :param params: Query parameters
+        :param timeout: Read timeout in seconds, the connection is considered stale if nothing arrives in time
+        :param key: Function returning item identity, used to skip duplicates after reconnect
+        :param flatten: Each chunk is a list of items (e.g. mempool operations)
+        :param gap: Function (last_item, next_item) returning RPC paths of skipped items (e.g. while disconnected)
+        :param reconnect: Re-establish connection on network and server (5xx) errors, default is True
+        :param resume: Re-establish connection when the stream ends, default is True; disable for streams which
+        end on purpose (e.g. mempool operations end with a new block)
+        :param backoff: Initial reconnect delay in seconds, doubled on every subsequent failure
+        :param max_backoff: Max reconnect delay in seconds
+        :param history: Number of item keys to remember
+        :param template: Path template used for metrics
+        """
+        self.node = node
+        self.path = path
+        self.params = params
+        self.timeout = timeout
+        self.key = key
+        self.flatten = flatten
+        self.gap = gap
+        self.reconnect = reconnect
+        self.resume = resume
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.history = history
+        self.template = template
+        self.reconnects = 0
+        self._seen = OrderedDict()
+        self._last = None
+        self._failures = 0
+
+    def __repr__(self):
+        res = [
+            super(MonitorStream, self).__repr__(),
+            '\nStream',
+            f'{urljoin(self.node.uri, self.path)}',
+            f'reconnects: {self.reconnects}'
+        ]
+        return '\n'.join(res)
+
+    def _is_new(self, item) -> bool:
+        if self.key is None:
+            return True
+        key = self.key(item)
+        if key in self._seen:
+            return False
+        self._seen[key] = None
+        if len(self._seen) > self.history:
+            self._seen.popitem(last=False)
+        return True
+
+    def _items(self, value) -> list:
+        return value if self.flatten else [value]
+
+    def _gap_paths(self, item) -> list:
+        if self.gap is None or self._last is None:
+            return []
+        return self.gap(self._last, item)
+
+    def _on_item(self, item):
+        self._last = item
+        self._failures = 0
+
+    def _is_transient(self, error) -> bool:
+        return isinstance(error, RpcError) and error.status_code is not None and error.status_code >= 500
+
+    def _on_failure(self, error) -> float:
+        if not self.reconnect:
+            raise error
+        delay = min(self.max_backoff, self.backoff * 2 ** self._failures)
+        self._failures += 1
+        self.reconnects += 1
+        logger.debug(f'{self.path} stream interrupted ({error}), reconnecting in {delay}s')
+        return delay
+
+    def __iter__(self):
+        while True:
+            try:
+                response = self.node.request('GET', self.path, template=self.template, params=self.params,
+                                             timeout=self.timeout, stream=True)
+                splitter = JsonSplitter()
+                try:
+                    for chunk in response.iter_content(chunk_size=None):
+                        for value in splitter.feed(chunk):
+                            for item in self._items(value):
+                                if not self._is_new(item):
+                                    continue
+                                for path in self._gap_paths(item):
+                                    missed = self.node.get(path)
+                                    if self._is_new(missed):
+                                        yield missed
+                                self._on_item(item)
+                                yield item
+                finally:
+                    response.close()
+                if not (self.reconnect and self.resume):
+                    return
+                sleep(self._on_failure(EOFError('stream closed by the node')))
+            except requests.RequestException as e:
+                sleep(self._on_failure(e))
+            except RpcError as e:
+                if not self._is_transient(e):
+                    raise
+                sleep(self._on_failure(e))
+
+
+class AsyncMonitorStream(MonitorStream):
+    """
+    Asyncio version of `MonitorStream` (requires `aiohttp`), use with `async for`.
+    """
+
+    async def __aiter__(self):
+        import aiohttp
+        from pytezos.rpc.aio import encode_params
+
+        while True:
+            try:
+                async with self.node._get_session().get(
+                        url=urljoin(self.node.uri, self.path),
+                        params=encode_params(self.params),
+                        timeout=aiohttp.ClientTimeout(total=None, sock_read=self.timeout)) as res:
+                    if res.status != 200:
+                        error = RpcError.from_text(await res.text(), content_type=res.content_type)
+                        error.status_code = res.status
+                        raise error from None
+
+                    splitter = JsonSplitter()
+                    async for chunk in res.content.iter_any():
+                        for value in splitter.feed(chunk):
+                            for item in self._items(value):
+                                if not self._is_new(item):
+                                    continue
+                                for path in self._gap_paths(item):
+                                    missed = await self.node.get(path)
+                                    if self._is_new(missed):
+                                        yield missed
+                                self._on_item(item)
+                                yield item
+                if not (self.reconnect and self.resume):
+                    return
+                await asyncio.sleep(self._on_failure(EOFError('stream closed by the node')))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                await asyncio.sleep(self._on_failure(e))
+            except RpcError as e:
+                if not self._is_transient(e):
+                    raise
+                await asyncio.sleep(self._on_failure(e))
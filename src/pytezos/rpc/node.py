@@ -1,8 +1,16 @@
 import requests
-from json import JSONDecodeError
+from json import JSONDecodeError, loads
 from hashlib import sha1
+from time import monotonic, sleep
 from urllib.parse import urlencode
 from pprint import pformat
+from loguru import logger
+
+from pytezos.rpc.cache import RpcCache, missing
+from pytezos.rpc.flight import SingleFlight
+from pytezos.rpc.metrics import RpcMetrics, path_template
+from pytezos.rpc.retry import RetryPolicy, CircuitBreaker, transient_statuses
+from pytezos.tools.jsonstream import iter_json_items
 
 
 def urljoin(*args):
@@ -21,6 +29,7 @@ def gen_error_variants(error_id) -> list:
 
 class RpcError(Exception):
     __handlers__ = {}
+    status_code = None  # HTTP status, if the error comes from a response
 
     @classmethod
     def __init_subclass__(cls, error_id=None, **kwargs):
@@ -44,12 +53,18 @@ class RpcError(Exception):
 
     @classmethod
     def from_response(cls, res: requests.Response):
-        if res.headers.get('content-type') == 'application/json':
-            errors = res.json()
+        error = cls.from_text(res.text, content_type=res.headers.get('content-type'))
+        error.status_code = res.status_code
+        return error
+
+    @classmethod
+    def from_text(cls, text: str, content_type=None):
+        if content_type == 'application/json':
+            errors = loads(text)
             assert isinstance(errors, list)
             return cls.from_errors(errors)
         else:
-            return RpcError(res.text)
+            return RpcError(text)
 
     def __str__(self):
         return pformat(self.args)
@@ -57,10 +72,32 @@ class RpcError(Exception):
 
 class RpcNode:
 
-    def __init__(self, uri, network=''):
+    def __init__(self, uri, network='', cache=None, disk_cache=None, metrics=None, cassette=None,
+                 retry_policy=None, circuit_breaker=None, indexer=None):
+        """
+        :param uri: RPC node address
+        :param network: Network name (optional)
+        :param cache: Response cache, default is `RpcCache()` (64MB, LRU with per-path TTL)
+        :param disk_cache: Persistent cache for immutable responses, e.g. `DiskCache()` (disabled by default),
+        can be shared by nodes of different networks
+        :param metrics: Request metrics collector, default is `RpcMetrics()` (can be shared between nodes)
+        :param cassette: Record or replay requests, e.g. `Cassette('session.jsonl.gz', mode='replay')`
+        :param retry_policy: Re-send idempotent requests on transient failures, default is `RetryPolicy()`,
+        set False to disable
+        :param circuit_breaker: Fail fast while the node is down, default is `CircuitBreaker()`, set False to disable
+        :param indexer: Local chain index consulted by `find_operation`, e.g. `ChainIndexer('mainnet.sqlite')`
+        """
         self.uri = uri
         self.network = network
-        self._cache = dict()
+        self.metrics = metrics if metrics is not None else RpcMetrics()
+        self._cache = cache if cache is not None else RpcCache()
+        self._disk_cache = disk_cache
+        self._disk_scope = None
+        self._cassette = cassette
+        self._retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self._circuit_breaker = CircuitBreaker() if circuit_breaker is None else circuit_breaker
+        self.indexer = indexer
+        self._flight = SingleFlight()
         self._session = requests.Session()
 
     def __repr__(self):
@@ -68,13 +105,19 @@ class RpcNode:
             super(RpcNode, self).__repr__(),
             '\nNode address',
             f'{self.uri} ({self.network})',
-            '\nCached urls',
-            *list(self._cache.keys())
+            '\nCache',
+            *list(map(lambda x: f'{x[0]}: {x[1]}', self._cache.stats().items()))
         ]
         return '\n'.join(res)
 
-    def request(self, method, path, **kwargs) -> requests.Response:
-        res = self._session.request(
+    def cache_stats(self) -> dict:
+        """
+        Get response cache counters: hits, misses, evictions, size.
+        """
+        return self._cache.stats()
+
+    def _request(self, method, path, **kwargs) -> requests.Response:
+        return self._session.request(
             method=method,
             url=urljoin(self.uri, path),
             headers={
@@ -83,46 +126,186 @@ class RpcNode:
             },
             **kwargs
         )
+
+    def _attempt(self, method, path, template, **kwargs) -> requests.Response:
+        started_at = monotonic()
+        try:
+            if self._cassette is not None:
+                res = self._cassette(self._request, method, path, **kwargs)
+            else:
+                res = self._request(method, path, **kwargs)
+        except requests.RequestException:
+            self.metrics.observe(method, template, 'error', monotonic() - started_at)
+            raise
+
+        if kwargs.get('stream'):
+            size = int(res.headers.get('content-length', 0))
+        else:
+            size = len(res.content)
+        self.metrics.observe(method, template, res.status_code, monotonic() - started_at, size)
+        return res
+
+    def _is_transient(self, res: requests.Response) -> bool:
+        if self._retry_policy:
+            return res.status_code in self._retry_policy.statuses
+        return res.status_code in transient_statuses
+
+    def request(self, method, path, template=None, **kwargs) -> requests.Response:
+        """
+        Send request (with retries if it's idempotent) and record metrics.
+        :param method: HTTP method
+        :param path: RPC path
+        :param template: Path template used for metrics, derived from the path if not set
+        :param kwargs: Passed to `requests`
+        """
+        template = template or path_template(path)
+        retryable = self._retry_policy and self._retry_policy.is_retryable(method, path)
+        if self._circuit_breaker:
+            self._circuit_breaker.check()
+
+        transient, started_at, attempt = True, monotonic(), 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    res = self._attempt(method, path, template, **kwargs)
+                    transient = self._is_transient(res)
+                    if not transient:
+                        break
+                    error = None
+                except requests.RequestException as e:
+                    error = e
+
+                delay = self._retry_policy.next_delay(attempt, started_at) if retryable else None
+                if delay is None:
+                    if error is not None:
+                        raise error
+                    break
+
+                logger.debug(f'retrying {method} {path} in {delay:.2f}s ({error or res.status_code})')
+                if error is None:
+                    res.close()
+                sleep(delay)
+        finally:
+            if self._circuit_breaker:
+                if transient:
+                    self._circuit_breaker.failure()
+                else:
+                    self._circuit_breaker.success()
+
         if res.status_code != 200:
             raise RpcError.from_response(res) from None
 
         return res
 
-    def get(self, path, params=None, caching=False, cache_key=None, timeout=None):
-        if caching:
-            if not cache_key:
-                cache_key = path
-                if params:
-                    cache_key += f'?{urlencode(params)}'
-            if cache_key in self._cache:
-                return self._cache[cache_key]
-
-        res = self.request('GET', path, params=params, timeout=timeout).json()
-        if caching:
-            self._cache[cache_key] = res
+    def disk_scope(self) -> str:
+        """
+        Get chain ID used to scope persistent cache entries (fetched once, bypassing caches).
+        """
+        if self._disk_scope is None:
+            self._disk_scope = self.request('GET', 'chains/main/chain_id').json()
+        return self._disk_scope
 
+    def _cache_get(self, cache, key, template, name):
+        res = cache.get(key, missing)
+        self.metrics.cache_lookup(template, hit=res is not missing, cache=name)
         return res
 
-    def post(self, path, params=None, json=None, caching=False):
-        cache_key = None
+    def get(self, path, params=None, caching=False, cache_key=None, timeout=None, template=None):
+        request_key = path
+        if params:
+            request_key += f'?{urlencode(params)}'
+        scope = self.disk_scope() if self._disk_cache is not None else None
+        persistent = scope is not None and self._disk_cache.is_cacheable(path, scope)
+        template = template or path_template(path)
+
         if caching:
-            cache_key = sha1((path + str(json)).encode()).hexdigest()
-            if cache_key in self._cache:
-                return self._cache[cache_key]
+            cache_key = cache_key or request_key
+            res = self._cache_get(self._cache, cache_key, template, 'memory')
+            if res is not missing:
+                return res
 
-        response = self.request('POST', path, params=params, json=json)
-        try:
+        def fetch():
+            if persistent:
+                res = self._cache_get(self._disk_cache, f'{scope}:{request_key}', template, 'disk')
+                if res is not missing:
+                    return res
+
+            response = self.request('GET', path, template=template, params=params, timeout=timeout)
             res = response.json()
-        except JSONDecodeError:
-            res = response.text
+            if caching:
+                self._cache.put(cache_key, res, size=len(response.content), path=path)
+            if persistent:
+                self._disk_cache.put(f'{scope}:{request_key}', path, response.content)
+            elif scope is not None:
+                self._disk_cache.observe(path, res, scope)
+            return res
+
+        return self._flight(('GET', request_key), fetch)
+
+    def post(self, path, params=None, json=None, caching=False, template=None):
+        request_key = sha1((path + str(params) + str(json)).encode()).hexdigest()
+        scope = self.disk_scope() if self._disk_cache is not None else None
+        persistent = scope is not None and self._disk_cache.is_cacheable(path, scope)
+        template = template or path_template(path)
 
         if caching:
-            self._cache[cache_key] = res
+            res = self._cache_get(self._cache, request_key, template, 'memory')
+            if res is not missing:
+                return res
 
-        return res
+        def fetch():
+            if persistent:
+                res = self._cache_get(self._disk_cache, f'{scope}:{request_key}', template, 'disk')
+                if res is not missing:
+                    return res
+
+            response = self.request('POST', path, template=template, params=params, json=json)
+            try:
+                res = response.json()
+            except JSONDecodeError:
+                res = response.text
+            else:
+                if persistent:
+                    self._disk_cache.put(f'{scope}:{request_key}', path, response.content)
+
+            if caching:
+                self._cache.put(request_key, res, size=len(response.content), path=path)
+            return res
+
+        return self._flight(('POST', request_key), fetch)
+
+    def stream(self, path, prefix='item', params=None, timeout=None, chunk_size=2 ** 16, template=None):
+        """
+        Decode response items incrementally, without buffering the whole body.
+        :param path: RPC path
+        :param prefix: Dot-separated path to the items inside the response (see `iter_json_items`)
+        :param params: Query parameters
+        :param timeout: Request timeout in seconds
+        :param chunk_size: Read buffer size in bytes
+        :param template: Path template used for metrics
+        :return: Generator (lazy)
+        """
+        response = self.request('GET', path, template=template, params=params, timeout=timeout, stream=True)
+        try:
+            yield from iter_json_items(response.iter_content(chunk_size=chunk_size), prefix=prefix)
+        finally:
+            response.close()
+
+    def monitor(self, path, params=None, timeout=None, **kwargs):
+        """
+        Subscribe to a streaming RPC, reconnects automatically.
+        :param path: RPC path
+        :param params: Query parameters
+        :param timeout: Read timeout in seconds
+        :param kwargs: See `MonitorStream`
+        :return: Iterable (lazy)
+        """
+        from pytezos.rpc.monitor import MonitorStream
+        return MonitorStream(self, path, params=params, timeout=timeout, **kwargs)
 
-    def delete(self, path, params=None):
-        return self.request('DELETE', path, params=params).json()
+    def delete(self, path, params=None, template=None):
+        return self.request('DELETE', path, template=template, params=params).json()
 
-    def put(self, path, params=None):
-        return self.request('PUT', path, params=params).json()
+    def put(self, path, params=None, template=None):
+        return self.request('PUT', path, template=template, params=params).json()
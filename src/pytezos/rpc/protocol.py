@@ -1,5 +1,3 @@
-import pendulum
-from pendulum.parsing.exceptions import ParserError
 from datetime import datetime
 from itertools import count
 from typing import Iterator
@@ -11,6 +9,8 @@ from pytezos.encoding import is_bh, is_ogh
 
 
 def to_timestamp(v):
+    import pendulum
+    from pendulum.parsing.exceptions import ParserError
     try:
         v = pendulum.parse(v)
     except ParserError:
@@ -289,12 +289,12 @@ class OperationListListQuery(RpcQuery, path=['/chains/{}/blocks/{}/operations'])
 
     def find_upvotes(self, proposal_id) -> list:
         """
-        Find operations of kind `proposal` for given proposal
+        Find operations of kind `proposals` for given proposal
         :param proposal_id: Proposal hash (base58)
         """
         def is_upvote(op):
             return any(map(
-                lambda x: x['kind'] == 'proposal' and proposal_id in x.get('proposals', []),
+                lambda x: x['kind'] == 'proposals' and proposal_id in x.get('proposals', []),
                 op['contents']))
         return list(filter(is_upvote, self.votes()))
 
@@ -1,11 +1,13 @@
+from functools import lru_cache
 from os.path import dirname
 
 from pytezos.rpc.node import RpcNode
-from pytezos.rpc.docs import rpc_docs
 from pytezos.tools.docstring import get_attr_docstring, get_class_docstring, InlineDocstring
 
 
+@lru_cache(maxsize=None)
 def format_docstring(class_type, query_path):
+    from pytezos.rpc.docs import rpc_docs
     res = ['']
     methods = {
         'GET': '()',
@@ -46,7 +48,7 @@ def format_docstring(class_type, query_path):
         attr_filter=lambda x: not x.startswith('_')
                               and x not in properties
                               and x.upper() not in methods
-                              and x != 'path'
+                              and x not in ('path', 'node')
     )
     if helpers:
         res.append(f'Helpers\n{helpers}')
@@ -54,8 +56,37 @@ def format_docstring(class_type, query_path):
     return '\n'.join(res)
 
 
-class RpcQuery(metaclass=InlineDocstring):
+class QueryDocstring:
+    """
+    Formats the docstring of a query on access: for the path of a query object, or for the (first) registered
+    path of a query class unless it declares its own docstring.
+    """
+
+    def __init__(self, docstring):
+        self.docstring = docstring
+
+    def __get__(self, instance, owner):
+        if instance is not None:
+            return format_docstring(instance.__class__, instance._wild_path or '/')
+        if self.docstring:
+            return self.docstring
+        return format_docstring(owner, next((k for k, v in owner.__extensions__.items() if v is owner), '') or '/')
+
+
+class QueryMeta(InlineDocstring):
+    """
+    Makes query objects compact (empty `__slots__` unless declared) and their docstrings lazy.
+    """
+
+    def __new__(mcs, name, bases, attrs, **kwargs):
+        attrs.setdefault('__slots__', ())
+        attrs['__doc__'] = QueryDocstring(attrs.get('__doc__'))
+        return super(QueryMeta, mcs).__new__(mcs, name, bases, attrs, **kwargs)
+
+
+class RpcQuery(metaclass=QueryMeta):
     __extensions__ = dict()
+    __slots__ = ('node', '_wild_path', '_caching', '_timeout', '_params')
 
     @classmethod
     def __init_subclass__(cls, path='', **kwargs):
@@ -72,7 +103,6 @@ class RpcQuery(metaclass=InlineDocstring):
         self._caching = caching
         self._timeout = timeout
         self._params = params or list()
-        self.__doc__ = format_docstring(self.__class__, self._wild_path or '/')
 
     def __repr__(self):
         res = [
@@ -97,11 +127,35 @@ class RpcQuery(metaclass=InlineDocstring):
     def path(self):
         return self._wild_path.format(*self._params)
 
+    @property
+    def _template(self):
+        return self._wild_path or '/'
+
     def __call__(self, **params):
         return self.node.get(
             path=self.path,
             params=params,
-            caching=self._caching
+            caching=self._caching,
+            template=self._template
+        )
+
+    def stream(self, prefix='item', **params):
+        """
+        Iterate over response items without loading the whole response into memory.
+        :param prefix: Dot-separated path to the items: `item` (any list element), list index, dict key,
+        or `*` (any dict key, yields key-value pairs). Examples:
+        `shell.blocks[x].operations.stream('item.item')` — all operations of a block;
+        `shell.contracts[kt].storage.stream('args.0.item')` — `Elt` entries of a map in the left node of the storage;
+        `shell.head.context.raw.json.stream('*', depth=2)` — top-level context nodes.
+        :param params: Query parameters
+        :return: Generator (lazy)
+        """
+        return self.node.stream(
+            path=self.path,
+            prefix=prefix,
+            params=params,
+            timeout=self._timeout,
+            template=self._template
         )
 
     def _getitem(self, item):
@@ -129,7 +183,8 @@ class RpcQuery(metaclass=InlineDocstring):
             path=self.path,
             params=params,
             caching=self._caching,
-            timeout=self._timeout
+            timeout=self._timeout,
+            template=self._template
         )
 
     def _post(self, json=None, params=None):
@@ -137,19 +192,22 @@ class RpcQuery(metaclass=InlineDocstring):
             path=self.path,
             params=params,
             json=json,
-            caching=self._caching
+            caching=self._caching,
+            template=self._template
         )
 
     def _put(self, params=None):
         return self.node.put(
             path=self.path,
-            params=params
+            params=params,
+            template=self._template
         )
 
     def _delete(self, params=None):
         return self.node.delete(
             path=self.path,
-            params=params
+            params=params,
+            template=self._template
         )
 
     @property
@@ -0,0 +1,123 @@
+import re
+import requests
+from random import uniform
+from threading import Lock
+from time import monotonic
+
+safe_post_paths = re.compile(
+    r'/helpers/('
+    r'forge/|parse/|preapply/|'
+    r'scripts/(run_operation|run_code|trace_code|typecheck_code|typecheck_data|pack_data|entrypoints?)'
+    r')'
+)
+transient_statuses = {429, 502, 503, 504}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Node is considered down, request was not sent.
+    """
+
+
+class RetryPolicy:
+    """
+    Re-send idempotent requests (GET and side-effect free POST helpers) in case of network errors
+    and transient HTTP statuses, with exponentially growing jittered delays.
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.2, max_backoff=5., deadline=30., statuses=None):
+        """
+        :param max_attempts: Max number of attempts including the first one, default is 3
+        :param backoff: Initial delay in seconds, doubled on every attempt
+        :param max_backoff: Max delay in seconds
+        :param deadline: Give up if the next attempt would start later than this number of seconds after the first
+        :param statuses: HTTP statuses considered transient, default is 429, 502, 503, 504
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.statuses = transient_statuses if statuses is None else set(statuses)
+
+    def __repr__(self):
+        return f'{super(RetryPolicy, self).__repr__()}\n{self.max_attempts} attempts, ' \
+               f'backoff {self.backoff}..{self.max_backoff}s, deadline {self.deadline}s'
+
+    def is_retryable(self, method, path) -> bool:
+        """
+        Check if request can be safely re-sent.
+        :param method: HTTP method
+        :param path: RPC path
+        """
+        if method == 'GET':
+            return True
+        return method == 'POST' and safe_post_paths.search(path) is not None
+
+    def next_delay(self, attempt, started_at):
+        """
+        Get delay before the next attempt (full jitter).
+        :param attempt: Number of attempts made so far
+        :param started_at: Monotonic time of the first attempt
+        :return: Delay in seconds or None if there should be no more attempts
+        """
+        if attempt >= self.max_attempts:
+            return None
+        delay = uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if self.deadline is not None and monotonic() + delay - started_at > self.deadline:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the node is down: after a number of consecutive failures all requests are rejected
+    for a cool-down period, then a single trial request decides whether to close the circuit again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.):
+        """
+        :param failure_threshold: Number of consecutive failed requests to open the circuit, default is 5
+        :param reset_timeout: Cool-down period in seconds, default is 30
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f'{super(CircuitBreaker, self).__repr__()}\n{self.state} ({self.failures} failures)'
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if monotonic() - self.opened_at < self.reset_timeout:
+            return 'open'
+        return 'half-open'
+
+    def check(self):
+        """
+        Raise `CircuitOpenError` unless the request is allowed.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if monotonic() - self.opened_at >= self.reset_timeout and not self._trial:
+                self._trial = True
+                return
+        raise CircuitOpenError(f'Circuit is open after {self.failures} consecutive failures')
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = monotonic()
+            self._trial = False
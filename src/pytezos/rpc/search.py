@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from typing import Any, Callable, Generator
 from loguru import logger
 
@@ -7,65 +8,94 @@ from pytezos.tools.docstring import get_attr_docstring
 from pytezos.encoding import is_bh
 
 
+def probe_levels(get: Callable, levels: list, executor=None) -> list:
+    if executor is None or len(levels) < 2:
+        return list(map(get, levels))
+    return list(executor.map(get, levels))
+
+
 def find_state_change_intervals(head: int, last: int, get: Callable, equals: Callable,
-                                step=60) -> Generator:
+                                step=60, concurrency=1) -> Generator:
+    from concurrent.futures import ThreadPoolExecutor
     succ_value = get(head)
     logger.debug(f'{succ_value} at head {head}')
 
-    for level in range(head - step, last, -step):
-        value = get(level)
-        logger.debug(f'{value} at level {level}')
+    levels = list(range(head - step, last, -step))
+    with ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else nullcontext() as executor:
+        for i in range(0, len(levels), concurrency):
+            batch = levels[i:i + concurrency]
+            for level, value in zip(batch, probe_levels(get, batch, executor)):
+                logger.debug(f'{value} at level {level}')
 
-        if not equals(value, succ_value):
-            logger.debug(f'{value} -> {succ_value} at ({level}, {level + step})')
-            yield level + step, succ_value, level, value
-            succ_value = value
+                if not equals(value, succ_value):
+                    logger.debug(f'{value} -> {succ_value} at ({level}, {level + step})')
+                    yield level + step, succ_value, level, value
+                    succ_value = value
 
 
 def find_state_change(head: int, last: int, get: Callable, equals: Callable,
-                      pred_value: Any) -> (int, Any):
-    def bisect(start: int, end: int):
-        if end == start + 1:
-            return end, get(end)
-
-        level = (end + start) // 2
-        value = get(level)
-        logger.debug(f'{value} at level {level}')
+                      pred_value: Any, concurrency=1) -> (int, Any):
+    """
+    Find the first level after `last` where the value differs from `pred_value` (k-ary search).
+    :param head: Upper bound, the value is known to be changed
+    :param last: Lower bound, the value is known to be `pred_value`
+    :param get: Function returning value at a given level
+    :param equals: Function comparing two values
+    :param pred_value: Value at `last`
+    :param concurrency: Number of levels probed concurrently per round, default is 1 (bisection)
+    :return: (level, value)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    start, end, rounds = last, head, 0
+    with ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else nullcontext() as executor:
+        while end > start + 1:
+            if end - start <= concurrency + 1:
+                levels = list(range(start + 1, end))
+            else:
+                levels = [start + (end - start) * i // (concurrency + 1) for i in range(1, concurrency + 1)]
 
-        if equals(value, pred_value):
-            return bisect(level, end)
-        else:
-            return bisect(start, level)
+            rounds += 1
+            for level, value in zip(levels, probe_levels(get, levels, executor)):
+                logger.debug(f'{value} at level {level}')
+                if equals(value, pred_value):
+                    start = level
+                else:
+                    end = level
+                    break
 
-    return bisect(last, head)
+    logger.debug(f'state change at {end} found in {rounds} rounds')
+    return end, get(end)
 
 
 def walk_state_change_interval(head: int, last: int, get: Callable, equals: Callable,
-                               head_value: Any, last_value: Any) -> Generator:
+                               head_value: Any, last_value: Any, concurrency=1) -> Generator:
     level = last
     value = last_value
     while not equals(value, head_value):
-        level, value = find_state_change(head, level, get, equals, pred_value=value)
+        level, value = find_state_change(head, level, get, equals, pred_value=value, concurrency=concurrency)
         logger.debug(f'{last_value} -> {value} at {level}')
         yield level, value
 
 
 def find_state_changes(head: int, last: int, get: Callable, equals: Callable,
-                       step=60) -> Generator:
-    state_change_intervals = find_state_change_intervals(head, last, get, equals, step)
+                       step=60, concurrency=1) -> Generator:
+    state_change_intervals = find_state_change_intervals(head, last, get, equals, step, concurrency)
     for int_head, int_head_value, int_tail, int_last_value in state_change_intervals:
         for change in walk_state_change_interval(int_head, int_tail, get, equals,
                                                  head_value=int_head_value,
-                                                 last_value=int_last_value):
+                                                 last_value=int_last_value,
+                                                 concurrency=concurrency):
             yield change
 
 
 class BlockSliceQuery(RpcQuery):
+    __slots__ = ('_start', '_stop', '_probes')
 
     def __init__(self, start: int, stop=None, **kwargs):
         super(BlockSliceQuery, self).__init__(**kwargs)
         self._start = start
         self._stop = stop or 'head'
+        self._probes = dict()
 
     def __repr__(self):
         res = [
@@ -121,60 +151,86 @@ class BlockSliceQuery(RpcQuery):
 
         return get_level(self._start), get_level(self._stop)
 
-    def find_proposal_injection(self, proposal_id):
+    def _memoize(self, key, get: Callable) -> Callable:
+        """
+        Remember probe results, so that subsequent searches on this range do not repeat requests.
+        :param key: Probe identity, e.g. ('proposals', proposal_id)
+        :param get: Function returning value at a given level
+        """
+        probes = self._probes.setdefault(key, dict())
+
+        def memoized_get(level):
+            if level not in probes:
+                probes[level] = get(level)
+            return probes[level]
+
+        return memoized_get
+
+    def _get_proposal_votes(self, proposal_id) -> Callable:
+        return self._memoize(('proposals', proposal_id),
+                             lambda x: self._getitem(x).votes.proposals[proposal_id]())
+
+    def find_proposal_injection(self, proposal_id, max_workers=8):
         """
         Find proposal injection.
         :param proposal_id: Proposal hash (base58)
+        :param max_workers: Number of levels probed concurrently, set 1 for plain bisection
         """
         last, head = self.get_range()
         level, _ = find_state_change(
             head=head - 1,  # proposals are empty at the last block
             last=last,
-            get=lambda x: self._getitem(x).votes.proposals[proposal_id](),
+            get=self._get_proposal_votes(proposal_id),
             equals=lambda x, y: x == y,
-            pred_value=0
+            pred_value=0,
+            concurrency=max_workers
         )
         votes = self._getitem(level).operations.find_votes(proposal_id)
         assert len(votes) == 1
         return votes
 
-    def find_upvotes(self, proposal_id) -> Generator:
+    def find_upvotes(self, proposal_id, max_workers=8) -> Generator:
         """
        Find upvoting operations for the given proposal.
        :param proposal_id: Proposal hash (base58)
+       :param max_workers: Number of levels probed concurrently, set 1 for sequential scan and bisection
        :return: Generator (lazy)
        """
         last, head = self.get_range()
         state_changes = find_state_changes(
             head=head - 1,  # proposals are empty at the last block
             last=last,
-            get=lambda x: self._getitem(x).votes.proposals[proposal_id](),
-            equals=lambda x, y: x == y
+            get=self._get_proposal_votes(proposal_id),
+            equals=lambda x, y: x == y,
+            concurrency=max_workers
         )
         for level, _ in state_changes:
             for upvote in self._getitem(level).operations.find_upvotes(proposal_id):
                 yield upvote
 
-    def find_ballots(self) -> Generator:
+    def find_ballots(self, max_workers=8) -> Generator:
         """
         Find ballot operations for the current period.
+        :param max_workers: Number of levels probed concurrently, set 1 for sequential scan and bisection
         :return: Generator (lazy)
         """
         last, head = self.get_range()
         state_changes = find_state_changes(
                 head=head - 1,  # ballots are empty at the last block
                 last=last,
-                get=lambda x: self._getitem(x).votes.ballots(),
-                equals=lambda x, y: x == y
+                get=self._memoize(('ballots',), lambda x: self._getitem(x).votes.ballots()),
+                equals=lambda x, y: x == y,
+                concurrency=max_workers
         )
         for level, _ in state_changes:
             for ballot in self._getitem(level).operations.find_ballots():
                 yield ballot
 
-    def find_origination(self, contract_id):
+    def find_origination(self, contract_id, max_workers=8):
         """
         Find contract origination
         :param contract_id: Contract ID (KT-address)
+        :param max_workers: Number of levels probed concurrently, set 1 for plain bisection
         """
         def get_counter(x):
             try:
@@ -185,28 +241,111 @@ class BlockSliceQuery(RpcQuery):
         level, _ = find_state_change(
             head=self.head.level(),
             last=0,
-            get=get_counter,
+            get=self._memoize(('counter', contract_id), get_counter),
             equals=lambda x, y: x == y,
-            pred_value=None
+            pred_value=None,
+            concurrency=max_workers
         )
         return self._getitem(level).operations.find_origination(contract_id)
 
+    def get_block_hashes(self) -> list:
+        """
+        Get block levels and hashes for this interval (single request).
+        :return: list of (level, block_hash) tuples, from the top to the bottom
+        """
+        header = self._getitem(self._stop).header()
+        head = header['level']
+        last = head + self._start if self._start < 0 else self._start
+        length = max(0, head - max(1, last) + 1)
+        if length == 0:
+            return []
+        block_hashes = super(BlockSliceQuery, self).__call__(length=length, head=header['hash'])[0]
+        return [(head - i, block_hash) for i, block_hash in enumerate(block_hashes)]
+
+    def iter_operation_hashes(self, max_workers=8) -> Generator:
+        """
+        Fetch operation hashes of all blocks in this interval concurrently.
+        Requests are addressed by block hash, so the responses are cached and reused by subsequent scans.
+        :param max_workers: Max number of concurrent requests
+        :return: Generator (lazy) of (level, operation_hashes) tuples, from the top to the bottom
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        block_hashes = self.get_block_hashes()
+        if not block_hashes:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(block_hashes)))
+        futures = [executor.submit(self._getitem(block_hash).operation_hashes)
+                   for _, block_hash in block_hashes]
+        try:
+            for (level, _), future in zip(block_hashes, futures):
+                yield level, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def locate_operations(self, operation_group_hashes, max_workers=8) -> dict:
+        """
+        Find locations of several operation groups in one scan, stops as soon as all are found.
+        Hashes known to the node's `indexer` (if configured) are resolved locally, regardless of the range.
+        :param operation_group_hashes: list of base58 hashes
+        :param max_workers: Max number of concurrent requests
+        :return: dict {operation_group_hash: (level, validation_pass, index)}, missing hashes are omitted
+        """
+        pending = set(operation_group_hashes)
+        res = dict()
+        if self.node.indexer is not None:
+            res.update(self.node.indexer.locate_operations(pending))
+            pending.difference_update(res)
+            if not pending:
+                return res
+
+        for level, operation_hashes in self.iter_operation_hashes(max_workers=max_workers):
+            for validation_pass, og_hashes in enumerate(operation_hashes):
+                for index, og_hash in enumerate(og_hashes):
+                    if og_hash in pending:
+                        res[og_hash] = (level, validation_pass, index)
+                        pending.remove(og_hash)
+            if not pending:
+                break
+        return res
+
+    def locate_operation(self, operation_group_hash, max_workers=8) -> tuple:
+        """
+        Find location of the operation group without fetching its content.
+        :param operation_group_hash: base58
+        :param max_workers: Max number of concurrent requests
+        :return: (level, validation_pass, index)
+        """
+        res = self.locate_operations([operation_group_hash], max_workers=max_workers)
+        if operation_group_hash not in res:
+            raise StopIteration(operation_group_hash)
+        return res[operation_group_hash]
+
+    def find_operations(self, operation_group_hashes, max_workers=8) -> dict:
+        """
+        Find several operations in one scan.
+        :param operation_group_hashes: list of base58 hashes
+        :param max_workers: Max number of concurrent requests
+        :return: dict {operation_group_hash: operation}, missing hashes are omitted
+        """
+        locations = self.locate_operations(operation_group_hashes, max_workers=max_workers)
+        return {
+            og_hash: self._getitem(level).operations[validation_pass][index]()
+            for og_hash, (level, validation_pass, index) in locations.items()
+        }
+
     def find_operation(self, operation_group_hash):
         """
         Find operation by hash
         :param operation_group_hash: base58
         :return: dict
         """
-        last, head = self.get_range()
-        for block_level in range(head, max(1, last - 1), -1):
-            try:
-                return self._getitem(block_level).operations[operation_group_hash]()
-            except StopIteration:
-                continue
+        level, validation_pass, index = self.locate_operation(operation_group_hash)
+        return self._getitem(level).operations[validation_pass][index]()
 
-        raise StopIteration(operation_group_hash)
 
-    
 class PeriodQuery(RpcQuery):
     __pos_key__ = ''
     __val_key__ = ''
@@ -1,9 +1,6 @@
-import requests
-import simplejson as json
 from functools import lru_cache
 from binascii import hexlify
-from datetime import datetime
-from time import sleep
+from operator import itemgetter
 
 from pytezos.encoding import base58_decode
 from pytezos.rpc.query import RpcQuery
@@ -63,23 +60,54 @@ class ShellQuery(RpcQuery, path=''):
     def mempool(self):
         return self.chains.main.mempool
 
-    def wait_next_block(self, block_hash=None, block_time=60):
-        header = self.head.header()
-        if block_hash is None:
-            block_hash = header['hash']
+    def watch_mempool(self, destination=None, kind='transaction', entrypoint=None, **kwargs):
+        """
+        Iterate over operations reaching the mempool.
+        Example: `shell.watch_mempool(factory_address, entrypoint=['demand', 'offer'])`
+        :param destination: Address or list of addresses (optional)
+        :param kind: Operation kind or list of kinds, default is `transaction`
+        :param entrypoint: Entrypoint name or list of names (optional)
+        :param kwargs: See `MempoolWatcher`
+        :return: MempoolWatcher
+        """
+        from pytezos.rpc.mempool import MempoolWatcher
+        return MempoolWatcher(self, destination=destination, kind=kind, entrypoint=entrypoint, **kwargs)
 
-        prev_block_dt = datetime.strptime(header['timestamp'], '%Y-%m-%dT%H:%M:%SZ')
-        delay_sec = block_time - prev_block_dt.second
-        print(f'Wait {delay_sec} seconds until block {block_hash} is finalized')
-        sleep(delay_sec)
+    @property
+    def head_tracker(self):
+        """
+        New heads notifier shared by all shells of the same node.
+        :return: HeadTracker
+        """
+        from pytezos.rpc.tracker import HeadTracker
+        return HeadTracker.shared(self)
 
-        for i in range(block_time):
-            current_block_hash = self.head.hash()
-            if current_block_hash == block_hash:
-                sleep(1)
-            else:
-                return current_block_hash
-        assert False
+    @property
+    def chain_context(self):
+        """
+        Chain ID, protocol, branch and head level snapshot shared by all shells of the same node.
+        :return: ChainContext
+        """
+        from pytezos.rpc.snapshot import ChainContext
+        return ChainContext.shared(self)
+
+    @property
+    def counter_manager(self):
+        """
+        Local counters of manager operations shared by all shells of the same node.
+        :return: CounterManager
+        """
+        from pytezos.rpc.counter import CounterManager
+        return CounterManager.shared(self)
+
+    def wait_next_block(self, block_hash=None, block_time=60):
+        """
+        Block until the head changes (waiters share a single monitoring stream).
+        :param block_hash: Current head hash, default is the head at the moment of the call
+        :param block_time: Expected block interval in seconds, give up after waiting for ten intervals
+        :return: New head hash
+        """
+        return self.head_tracker.wait_next_block(block_hash, timeout=10 * block_time)['hash']
 
 
 class ChainQuery(RpcQuery, path='/chains/{}'):
@@ -241,30 +269,32 @@ class ProtocolInjectionQuery(RpcQuery, path='/injection/protocol'):
         )
 
 
-class ResponseGenerator:
-
-    def __init__(self, res: requests.Response):
-        self._lines = res.iter_lines()
-
-    def __iter__(self):
-        for line in self._lines:
-            yield json.loads(line.decode())
+monitor_keys = {
+    '/monitor/bootstrapped': itemgetter('block'),
+    '/monitor/valid_blocks': itemgetter('hash')
+}
 
 
 class MonitorQuery(RpcQuery, path=['/monitor/active_chains',
                                    '/monitor/bootstrapped',
                                    '/monitor/commit_hash',
-                                   '/monitor/heads/{}',
                                    '/monitor/protocols',
                                    '/monitor/valid_blocks']):
 
-    def __call__(self, *args, **kwargs):
-        return ResponseGenerator(self.node.request(
-            method='GET',
+    def __call__(self, timeout=None, **params):
+        """
+        Subscribe to updates, the connection is re-established in case of network errors.
+        :param timeout: Read timeout in seconds
+        :param params: Query parameters
+        :return: Generator (lazy), async generator in case of `AsyncRpcNode`
+        """
+        return self.node.monitor(
             path=self.path,
-            params=kwargs,
-            stream=True
-        ))
+            params=params,
+            timeout=timeout,
+            key=monitor_keys.get(self._wild_path),
+            template=self._template
+        )
 
     def __repr__(self):
         res = [
@@ -274,6 +304,58 @@ class MonitorQuery(RpcQuery, path=['/monitor/active_chains',
         return '\n'.join(res)
 
 
+class MonitorHeadsQuery(MonitorQuery, path=['/monitor/heads', '/monitor/heads/{}']):
+
+    def __call__(self, next_protocol=None, timeout=None):
+        """
+        Subscribe to new heads of the chain (main by default), blocks skipped while disconnected are fetched separately.
+        :param next_protocol: Only blocks of the given protocol
+        :param timeout: Read timeout in seconds
+        :return: Generator of block headers (lazy), async generator in case of `AsyncRpcNode`
+        """
+        chain = self._params[-1] if self._wild_path.endswith('{}') else 'main'
+
+        def gap(last, head):
+            return [f'chains/{chain}/blocks/{level}/header' for level in range(last['level'] + 1, head['level'])]
+
+        return self.node.monitor(
+            path=f'monitor/heads/{chain}',
+            params={'next_protocol': next_protocol},
+            timeout=timeout,
+            key=itemgetter('hash'),
+            gap=gap if next_protocol is None else None,
+            template='/monitor/heads/{}'
+        )
+
+
+class MempoolMonitorQuery(RpcQuery, path='/chains/{}/mempool/monitor_operations'):
+
+    def __call__(self, applied=True, refused=False, branch_delayed=True, branch_refused=False, timeout=None):
+        """
+        Subscribe to mempool operations, duplicates (e.g. after reconnect) are skipped. The stream ends with a block.
+        :param applied: Include applied operations, default is True
+        :param refused: Include refused operations
+        :param branch_delayed: Include branch delayed operations, default is True
+        :param branch_refused: Include branch refused operations
+        :param timeout: Read timeout in seconds
+        :return: Generator of operations (lazy), async generator in case of `AsyncRpcNode`
+        """
+        return self.node.monitor(
+            path=self.path,
+            params={
+                'applied': applied,
+                'refused': refused,
+                'branch_delayed': branch_delayed,
+                'branch_refused': branch_refused
+            },
+            timeout=timeout,
+            key=itemgetter('hash'),
+            flatten=True,
+            resume=False,  # the node closes the stream on every new block, see `MempoolWatcher`
+            template=self._template
+        )
+
+
 class ConnectionQuery(RpcQuery, path='/network/connections/{}'):
 
     def delete(self, wait=False):
@@ -290,10 +372,7 @@ class NetworkLogQuery(RpcQuery, path=['/network/peers/{}/log', '/network/points/
 
     def __call__(self, monitor=False):
         if monitor:
-            return ResponseGenerator(self.node.request(
-                method='GET',
-                path=self.path,
-                stream=True
-            ))
+            return self.node.monitor(path=self.path, params={'monitor': True}, reconnect=False,
+                                     template=self._template)
         else:
             return self._get()
@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from loguru import logger
+
+contexts_lock = Lock()
+
+
+class ChainContext:
+    """
+    Snapshot of the chain state required to build operations: chain ID, protocol, branch and head level.
+    Chain ID is fetched once per process, the rest is refreshed when it gets older than `max_age` seconds
+    or on every new head if `follow_heads` is set. Shared by all operation groups built on the same node.
+    """
+
+    def __init__(self, shell, max_age=30., follow_heads=False):
+        """
+        :param shell: ShellQuery instance
+        :param max_age: Max snapshot age in seconds, default is 30 (branch stays valid for 60 blocks anyway)
+        :param follow_heads: Update snapshot from the shared `HeadTracker` instead of re-fetching it
+        """
+        self.shell = shell
+        self.max_age = max_age
+        self.chain_id = None
+        self.protocol = None
+        self.branch = None
+        self.level = None
+        self.head = None
+        self.updated_at = None
+        self.refreshes = 0
+        self._proto = None
+        self._voting_period = None
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chain-context')
+        if follow_heads:
+            shell.head_tracker.subscribe(self._on_head)
+
+    @classmethod
+    def shared(cls, shell, **kwargs) -> 'ChainContext':
+        """
+        Get context for the node of the given shell, create if not exists.
+        """
+        with contexts_lock:
+            # kept by the node: a weak mapping keyed by it would never release the context, which refers to the node
+            if getattr(shell.node, '_chain_context', None) is None:
+                shell.node._chain_context = cls(shell, **kwargs)
+            return shell.node._chain_context
+
+    def __repr__(self):
+        res = [
+            super(ChainContext, self).__repr__(),
+            '\nSnapshot',
+            f'chain_id: {self.chain_id}',
+            f'protocol: {self.protocol}',
+            f'branch: {self.branch}',
+            f'level: {self.level}',
+            f'refreshes: {self.refreshes}'
+        ]
+        return '\n'.join(res)
+
+    def _update(self, header):
+        self.protocol = header.get('protocol', self.protocol)
+        self.branch = header['predecessor']
+        self.level = header['level']
+        self.head = header['hash']
+        self._proto = header.get('proto', self._proto)
+        self._voting_period = None
+        self.updated_at = monotonic()
+
+    def _is_stale(self):
+        return self.updated_at is None or monotonic() - self.updated_at > self.max_age
+
+    def refresh(self, force=True):
+        """
+        Fetch head header (and chain ID for the first time) concurrently.
+        :param force: Refresh even if the snapshot is not stale, default is True
+        """
+        with self._lock:
+            if not force and not self._is_stale():
+                return  # refreshed by another thread while waiting for the lock
+            chain_id = self._executor.submit(self.shell.chains.main.chain_id) if self.chain_id is None else None
+            header = self.shell.head.header()
+            if chain_id is not None:
+                self.chain_id = chain_id.result()
+            self._update(header)
+            self.refreshes += 1
+            logger.debug(f'chain context refreshed at level {self.level}')
+
+    def _on_head(self, header):
+        if self.chain_id is None:
+            return  # not used yet
+        if header.get('proto') != self._proto:
+            self.refresh()  # protocol upgrade, monitored headers do not contain protocol hash
+        else:
+            with self._lock:
+                self._update(header)
+
+    def snapshot(self) -> dict:
+        """
+        Get up-to-date chain context.
+        :return: {chain_id, protocol, branch, level, head}
+        """
+        if self._is_stale():
+            self.refresh(force=False)
+        with self._lock:
+            return {
+                'chain_id': self.chain_id,
+                'protocol': self.protocol,
+                'branch': self.branch,
+                'level': self.level,
+                'head': self.head
+            }
+
+    def voting_period(self) -> int:
+        """
+        Get voting period of the snapshot head (cached until the head changes).
+        """
+        if self._voting_period is None:
+            self._voting_period = self.shell.blocks[self.head or 'head'].voting_period()
+        return self._voting_period
@@ -0,0 +1,190 @@
+import asyncio
+from threading import Condition, Lock, Thread
+from time import sleep
+from loguru import logger
+
+trackers_lock = Lock()
+
+
+class HeadTracker:
+    """
+    Single `/monitor/heads` subscription shared by any number of waiters: callbacks are invoked on every new head
+    and on chain reorganizations, blocking and async waiters are woken up without polling.
+    Use `shell.head_tracker` to get the tracker shared by all shells of the same node.
+    """
+
+    def __init__(self, shell, block_time=60, history=120):
+        """
+        :param shell: ShellQuery instance
+        :param block_time: Expected block interval in seconds, the stream is re-established if nothing arrives
+        within two intervals
+        :param history: Number of recent block hashes kept for reorganization detection
+        """
+        self.shell = shell
+        self.block_time = block_time
+        self.history = history
+        self.head = None
+        self.reorgs = 0
+        self._hashes = dict()  # level => block hash
+        self._subscribers = list()
+        self._cond = Condition()
+        self._thread = None
+        self._stopped = False
+
+    @classmethod
+    def shared(cls, shell, **kwargs) -> 'HeadTracker':
+        """
+        Get tracker for the node of the given shell, create if not exists.
+        """
+        with trackers_lock:
+            # kept by the node: a weak mapping keyed by it would never release the tracker, which refers to the node
+            if getattr(shell.node, '_head_tracker', None) is None:
+                shell.node._head_tracker = cls(shell, **kwargs)
+            return shell.node._head_tracker
+
+    def __repr__(self):
+        head = f'{self.head["hash"]} at {self.head["level"]}' if self.head else 'n/a'
+        res = [
+            super(HeadTracker, self).__repr__(),
+            '\nHead',
+            head,
+            '\nStatistics',
+            f'subscribers: {len(self._subscribers)}',
+            f'reorgs: {self.reorgs}'
+        ]
+        return '\n'.join(res)
+
+    def start(self):
+        """
+        Start background monitoring (called automatically on the first subscription or wait).
+        """
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """
+        Stop monitoring after the next head arrives.
+        """
+        with self._cond:
+            self._stopped = True
+
+    def subscribe(self, on_head, on_reorg=None):
+        """
+        Register callbacks, invoked from the tracker thread.
+        :param on_head: Function (header) called on every new head
+        :param on_reorg: Function (orphaned_hashes, header) called when previously seen blocks are replaced
+        :return: Function which cancels the subscription
+        """
+        subscriber = (on_head, on_reorg)
+        with self._cond:
+            self._subscribers.append(subscriber)
+        self.start()
+
+        def unsubscribe():
+            with self._cond:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def wait_next_block(self, block_hash=None, timeout=None) -> dict:
+        """
+        Block until the head changes.
+        :param block_hash: Current head hash, default is the head at the moment of the call
+        :param timeout: Max waiting time in seconds
+        :return: New head header
+        """
+        self.start()
+        with self._cond:
+            if block_hash is None:
+                if not self._cond.wait_for(lambda: self.head is not None, timeout):
+                    raise TimeoutError('No head received')
+                block_hash = self.head['hash']
+            if not self._cond.wait_for(lambda: self.head is not None and self.head['hash'] != block_hash, timeout):
+                raise TimeoutError(f'Head is still {block_hash}')
+            return self.head
+
+    async def next_block(self, block_hash=None) -> dict:
+        """
+        Awaitable version of `wait_next_block`.
+        :param block_hash: Current head hash, default is the head at the moment of the call
+        :return: New head header
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+
+        def on_head(header):
+            nonlocal block_hash
+            if block_hash is None:
+                block_hash = header['hash']  # the stream starts with the current head
+            elif header['hash'] != block_hash:
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(header))
+
+        # subscribe and read the head atomically, so that a head arriving in between is not missed
+        with self._cond:
+            unsubscribe = self.subscribe(on_head)
+            if block_hash is None and self.head is not None:
+                block_hash = self.head['hash']
+            elif block_hash is not None and self.head is not None and self.head['hash'] != block_hash:
+                future.set_result(self.head)
+        try:
+            return await future
+        finally:
+            unsubscribe()
+
+    def _orphaned(self, header) -> list:
+        """
+        Walk back from the new head until a known block is met, forget the replaced ones.
+        """
+        orphaned = list()
+        level, predecessor = header['level'], header['predecessor']
+        for known_level in sorted(filter(lambda x: x >= level, self._hashes), reverse=True):
+            orphaned.append(self._hashes.pop(known_level))
+
+        while level - 1 in self._hashes and self._hashes[level - 1] != predecessor:
+            orphaned.append(self._hashes.pop(level - 1))
+            predecessor = self.shell.blocks[predecessor].header()['predecessor']
+            level -= 1
+
+        return orphaned
+
+    def _on_head(self, header):
+        orphaned = self._orphaned(header)
+        with self._cond:
+            self._hashes[header['level']] = header['hash']
+            for level in sorted(self._hashes)[:-self.history]:
+                del self._hashes[level]
+            self.head = header
+            if orphaned:
+                self.reorgs += 1
+                logger.info(f'reorganization at {header["level"]}: {len(orphaned)} blocks orphaned')
+            subscribers = list(self._subscribers)
+            self._cond.notify_all()
+
+        for on_head, on_reorg in subscribers:
+            try:
+                if orphaned and on_reorg is not None:
+                    on_reorg(orphaned, header)
+                on_head(header)
+            except Exception as e:
+                logger.error(f'head subscriber failed: {e}')
+
+    def _run(self):
+        # the same stream is resumed after failures, so that blocks missed in between are fetched (gap)
+        stream = self.shell.monitor.heads(timeout=2 * self.block_time)
+        failures = 0
+        while not self._stopped:
+            try:
+                for header in stream:
+                    failures = 0
+                    self._on_head(header)
+                    if self._stopped:
+                        return
+            except Exception as e:
+                delay = min(stream.max_backoff, stream.backoff * 2 ** failures)
+                failures += 1
+                logger.error(f'head tracker interrupted ({e}), restarting in {delay}s')
+                sleep(delay)
@@ -0,0 +1,261 @@
+import re
+from json import loads
+from typing import Iterable, Generator
+
+whitespace = b' \t\r\n'
+special_re = re.compile(rb'["\[\]{}]')
+string_re = re.compile(rb'["\\]')
+scalar_end_re = re.compile(rb'[\s,\]}]')
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class JsonReader:
+
+    def __init__(self, chunks: Iterable[bytes], compact_threshold=2 ** 16):
+        self.buf = bytearray()
+        self.pos = 0
+        self._chunks = iter(chunks)
+        self._compact_threshold = compact_threshold
+
+    def fill(self) -> bool:
+        for chunk in self._chunks:
+            if chunk:
+                self.buf += chunk
+                return True
+        return False
+
+    def compact(self, force=False):
+        """
+        Drop consumed bytes.
+        """
+        if force or self.pos > self._compact_threshold:
+            del self.buf[:self.pos]
+            self.pos = 0
+
+    def peek(self):
+        """
+        Skip whitespaces and return next character (None in case of EOF).
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in whitespace:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return chr(self.buf[self.pos])
+            self.compact(force=True)
+            if not self.fill():
+                return None
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char is None or char not in chars:
+            raise JsonStreamError(f'Expected one of `{chars}`, got `{char}`')
+        self.pos += 1
+        return char
+
+    def _search(self, regexp, pos, keep) -> (int, int):
+        while True:
+            match = regexp.search(self.buf, pos)
+            if match:
+                return match.start(), pos
+            if not keep:
+                pos = max(0, pos - len(self.buf))
+                del self.buf[:]
+                self.pos = 0
+            else:
+                pos = max(pos, len(self.buf))
+            if not self.fill():
+                return None, pos
+
+    def _scan_string(self, pos, keep) -> int:
+        while True:
+            idx, pos = self._search(string_re, pos, keep)
+            if idx is None:
+                raise JsonStreamError('Unterminated string')
+            if self.buf[idx] == ord('"'):
+                return idx + 1
+            pos = idx + 2  # skip escaped character
+
+    def scan_value(self, keep=True) -> bytes:
+        """
+        Read (or skip) next JSON value without decoding.
+        :param keep: Return raw value, otherwise consumed bytes are discarded as early as possible
+        """
+        char = self.peek()
+        start = self.pos
+        if char is None:
+            raise JsonStreamError('Unexpected end of stream')
+
+        if char == '"':
+            end = self._scan_string(start + 1, keep)
+        elif char in '[{':
+            pos, depth = start, 0
+            while True:
+                idx, pos = self._search(special_re, pos, keep)
+                if idx is None:
+                    raise JsonStreamError('Unexpected end of stream')
+                token = self.buf[idx]
+                if token == ord('"'):
+                    pos = self._scan_string(idx + 1, keep)
+                    continue
+                pos = idx + 1
+                depth += 1 if token in b'[{' else -1
+                if depth == 0:
+                    end = pos
+                    break
+        else:
+            idx, _ = self._search(scalar_end_re, start, keep=True)
+            end = len(self.buf) if idx is None else idx
+
+        if not keep:
+            self.pos = end
+            return b''
+
+        self.pos = end
+        return bytes(self.buf[start:end])
+
+
+def matches(selector: str, key) -> bool:
+    if isinstance(key, int):
+        return selector == 'item' or selector == str(key)
+    return selector == '*' or selector == key
+
+
+def walk(reader: JsonReader, path: list, prefix: list) -> Generator:
+    depth = len(path)
+    if depth == len(prefix):
+        value = loads(reader.scan_value())
+        yield (path[-1], value) if prefix and prefix[-1] == '*' else value
+        return
+
+    char = reader.peek()
+    if char not in ('[', '{'):
+        reader.scan_value(keep=False)
+        return
+
+    reader.expect(char)
+    closing = ']' if char == '[' else '}'
+    if reader.peek() == closing:
+        reader.expect(closing)
+        return
+
+    index = 0
+    while True:
+        if char == '[':
+            key = index
+        else:
+            key = loads(reader.scan_value())
+            reader.expect(':')
+
+        if matches(prefix[depth], key):
+            yield from walk(reader, path + [key], prefix)
+        else:
+            reader.scan_value(keep=False)
+
+        reader.compact()
+        index += 1
+        if reader.expect(',' + closing) == closing:
+            return
+
+
+def iter_json_items(chunks: Iterable[bytes], prefix='item') -> Generator:
+    """
+    Incrementally decode JSON items at the given path, memory usage is bounded by the item size.
+    :param chunks: Raw JSON document split into chunks
+    :param prefix: Dot-separated path to the items, each component is either:
+    `item` (any list element), list index, dict key, or `*` (any dict key, yields key-value pairs)
+    e.g. `item.item` for block operations, `args.0.item` for `Elt` entries of a map in the left node of a pair
+    :return: Generator (lazy)
+    """
+    selectors = prefix.split('.') if prefix else []
+    yield from walk(JsonReader(chunks), [], selectors)
+
+
+class JsonSplitter:
+    """
+    Split a stream of concatenated JSON values (e.g. /monitor responses) into separate values.
+    Unlike `JsonReader` it is push-based, so it can be fed from both sync and async sources.
+    """
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.pos = 0
+        self.start = None
+        self.depth = 0
+        self.in_string = False
+
+    def _emit(self, res: list):
+        res.append(loads(self.buf[self.start:self.pos]))
+        self.start = None
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        Consume next chunk.
+        :param chunk: Raw bytes
+        :return: List of values completed by this chunk
+        """
+        self.buf += chunk
+        res = list()
+        while True:
+            if self.in_string:
+                match = string_re.search(self.buf, self.pos)
+                if not match:
+                    self.pos = max(self.pos, len(self.buf))
+                    break
+                if self.buf[match.start()] == ord('\\'):
+                    self.pos = match.start() + 2  # skip escaped character
+                    continue
+                self.pos = match.start() + 1
+                self.in_string = False
+                if self.depth == 0:
+                    self._emit(res)
+            elif self.depth > 0:
+                match = special_re.search(self.buf, self.pos)
+                if not match:
+                    self.pos = len(self.buf)
+                    break
+                token = self.buf[match.start()]
+                self.pos = match.start() + 1
+                if token == ord('"'):
+                    self.in_string = True
+                else:
+                    self.depth += 1 if token in b'[{' else -1
+                    if self.depth == 0:
+                        self._emit(res)
+            else:
+                while self.pos < len(self.buf) and self.buf[self.pos] in whitespace:
+                    self.pos += 1
+                if self.pos == len(self.buf):
+                    break
+                self.start = self.pos
+                token = self.buf[self.pos]
+                if token in b'[{':
+                    self.depth, self.pos = 1, self.pos + 1
+                elif token == ord('"'):
+                    self.in_string, self.pos = True, self.pos + 1
+                else:
+                    match = scalar_end_re.search(self.buf, self.pos)
+                    if not match:
+                        break  # wait for the rest of the scalar
+                    self.pos = match.start()
+                    self._emit(res)
+
+        offset = self.pos if self.start is None else self.start
+        del self.buf[:offset]
+        self.pos -= offset
+        if self.start is not None:
+            self.start = 0
+        return res
+
+
+def iter_json_values(chunks: Iterable[bytes]) -> Generator:
+    """
+    Decode concatenated JSON values as soon as each one is complete.
+    :param chunks: Raw stream split into chunks (arbitrarily)
+    :return: Generator (lazy)
+    """
+    splitter = JsonSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
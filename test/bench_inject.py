@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+RPC calls and CPU time per injected transaction (autofill, sign, inject, hash) against an in-process fake node,
+with and without remote forge validation.
+
+    python3 test/bench_inject.py [count]
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pytezos.client import PyTezosClient
+from pytezos.crypto import Key
+from pytezos.encoding import base58_encode
+from pytezos.operation.forge import forge_operation_group
+from pytezos.operation.group import OperationGroup
+from pytezos.rpc import ShellQuery, RpcNode
+
+destination = base58_encode(b'\x02' * 20, b'KT1').decode()
+state = {'counter': 10, 'injected': 0, 'calls': Counter()}
+
+
+class FakeNode(BaseHTTPRequestHandler):
+
+    def reply(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        state['calls'][path.rsplit('/', 1)[-1]] += 1
+        if path.endswith('/chain_id'):
+            self.reply('NetXdQprcVkpaWU')
+        elif path.endswith('/header'):
+            self.reply({'protocol': 'PsBabyM1tDN3Ao3YDVvJiaEsPh4wbw1wnzBhsBMcnGBJfTxs7V', 'chain_id': 'NetXdQprcVkpaWU',
+                        'hash': 'BLockGenesisGenesisGenesisGenesisGenesisf79b5d1CoW2', 'level': 100, 'proto': 5,
+                        'predecessor': 'BLockGenesisGenesisGenesisGenesisGenesisf79b5d1CoW2'})
+        elif path.endswith('/counter'):
+            self.reply(str(state['counter']))
+        elif path.endswith('/pending_operations'):
+            self.reply({'applied': [], 'refused': [], 'branch_refused': [], 'branch_delayed': [], 'unprocessed': []})
+        else:
+            self.reply([], 404)
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        state['calls'][path.rsplit('/', 1)[-1]] += 1
+        body = json.loads(self.rfile.read(int(self.headers['content-length'])))
+        if path.endswith('/run_operation'):
+            self.reply({'contents': [
+                {**content, 'metadata': {'operation_result': {'status': 'applied', 'consumed_gas': '20000'}}}
+                for content in body['operation']['contents']]})
+        elif path.endswith('/forge/operations'):
+            self.reply(forge_operation_group(body).hex())
+        elif path.endswith('/injection/operation'):
+            state['injected'] += 1
+            state['counter'] += 1
+            self.reply(f'oo{state["injected"]}')
+        else:
+            self.reply([], 404)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench(client, count):
+    state['calls'].clear()
+    started_at = time.process_time()
+    for _ in range(count):
+        opg = client.transaction(destination, parameters={'entrypoint': 'demand', 'value': {'prim': 'Unit'}})
+        opg.autofill().sign().inject(preapply=False)
+    cpu = (time.process_time() - started_at) * 1000 / count
+    calls = {name: round(value / count, 2) for name, value in state['calls'].items()}
+    return cpu, calls
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeNode)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    shell = ShellQuery(node=RpcNode(f'http://127.0.0.1:{server.server_port}/'))
+    client = PyTezosClient(shell=shell, key=Key.generate(export=False))
+    for rate in [1., 0.]:
+        OperationGroup.validation_rate = rate
+        cpu, calls = bench(client, count)
+        print(f'validation_rate={rate}: {cpu:.2f} ms CPU per transaction, RPC calls per transaction: {calls}')
+    server.shutdown()
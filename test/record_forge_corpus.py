@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Re-record the `forged` field of the forge corpus with `helpers/forge/operations` of the given node,
+reporting the cases where the node disagrees with the local forger.
+
+    python3 test/record_forge_corpus.py http://localhost:8732/
+"""
+import json
+import sys
+
+from pytezos.operation.forge import forge_operation_group
+from pytezos.rpc import ShellQuery, RpcNode
+
+from test_forge import corpus_path
+
+if __name__ == '__main__':
+    shell = ShellQuery(node=RpcNode(uri=sys.argv[1]))
+    with open(corpus_path) as f:
+        corpus = json.load(f)
+
+    for case in corpus:
+        case['forged'] = shell.head.helpers.forge.operations.post(case['operation'])
+        if case['forged'] != forge_operation_group(case['operation']).hex():
+            print(f'{case["description"]}: local forge result differs from remote one')
+
+    with open(corpus_path, 'w') as f:
+        f.write(json.dumps(corpus, indent=2) + '\n')
@@ -0,0 +1,33 @@
+import json
+from os.path import dirname, join
+from unittest import TestCase
+
+from pytezos.operation.forge import forge_operation_group, unforge_operation_group
+
+corpus_path = join(dirname(__file__), 'data', 'forge_operations.json')
+
+
+class TestForgeCorpus(TestCase):
+    """
+    Local forging against the corpus of `helpers/forge/operations` results (see record_forge_corpus.py).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with open(corpus_path) as f:
+            cls.corpus = json.load(f)
+
+    def test_corpus_covers_all_kinds(self):
+        from pytezos.operation.forge import operation_tags
+        kinds = {content['kind'] for case in self.corpus for content in case['operation']['contents']}
+        self.assertSetEqual(set(operation_tags), kinds)
+
+    def test_forge_operation_group(self):
+        for case in self.corpus:
+            with self.subTest(case['description']):
+                self.assertEqual(case['forged'], forge_operation_group(case['operation']).hex())
+
+    def test_unforge_operation_group(self):
+        for case in self.corpus:
+            with self.subTest(case['description']):
+                self.assertEqual(case['operation'], unforge_operation_group(bytes.fromhex(case['forged'])))
@@ -0,0 +1,79 @@
+from glob import glob
+from os.path import abspath, dirname, join
+from random import Random
+from unittest import TestCase
+
+from pytezos.michelson.grammar import MichelsonParser, MichelsonParserError
+from pytezos.michelson.parser import FastMichelsonParser
+
+contracts_dir = join(dirname(dirname(abspath(__file__))), 'contracts')
+
+snippets = [
+    '', ';', ';;', 'a', 'DUP', 'DUP;', '{}', '{};', '{{}}', 'PUSH int 1', 'PUSH int -1', 'PUSH bytes 0x12ab',
+    'PUSH bytes 0xZZ', 'PUSH string "a\\"b"', 'DIP {DROP; DUP}', 'DIIP {DROP}', 'PAIR %a %b', 'UNPAIR', 'CADR',
+    'SET_CADR', 'IF_SOME {} {}', 'CMPEQ', 'IFCMPEQ {} {}', 'ASSERT_CMPEQ', 'PAPPAIIR', 'UNPAPPAIIR', 'DUUP',
+    'DUP @x %y :z', 'DUP 1 @a', '(pair int nat)', 'pair (int %a) (nat :b)', 'PUSH (pair int nat) (Pair 1 2)',
+    '{DUP}{DUP}', 'DUP;;DROP', '{ DUP ; { DROP } ; }', 'DUP )', 'DUP (', '( )', 'PUSH ()', '/* c */ DUP # x\n; DROP',
+    '/* a\nb */ DUP', '$', '-', '0x', 'Pair 0x 1', '"a', 'Elt "a" 1', '{ Elt 1 2 ; Elt 3 4 }', 'MAP_CDR {}',
+    'Left (Right 1)', 'DIP 3 {}', 'x1', 'DUP @', '%%%', 'PUSH string "\\u0041"', 'PUSH string "\n"', 'ASSERT_SOME @x',
+    'CDAR %a', 'SET_CAR %x', 'FOO', 'IF_RIGHT {} {}; {DUP;}'
+]
+token_pool = [
+    '/* c */', '# x\n', '\n', '/*', 'a', '-', '0x', 'DUP', 'DIP', 'PAIR', 'CADR', 'int', 'Pair', '1', '-2', '0x0a',
+    '"s"', '{', '}', '(', ')', ';', '%a', '@b', ':c', 'UNPAIR', 'IF', 'DIIP', 'CMPEQ', 'Elt', 'nat'
+]
+
+
+def typed(expr):
+    """
+    Make list subclasses (e.g. `Sequence`) distinguishable in comparisons.
+    """
+    if isinstance(expr, list):
+        return type(expr).__name__, [typed(item) for item in expr]
+    if isinstance(expr, dict):
+        return {key: typed(value) for key, value in expr.items()}
+    return expr
+
+
+def parse(parser, code):
+    try:
+        return 'ok', typed(parser.parse(code))
+    except MichelsonParserError:
+        return 'error', None
+    except Exception as e:
+        return 'exception', type(e).__name__
+
+
+class TestFastMichelsonParser(TestCase):
+    """
+    Differential test against the PLY based parser: same output, or a failure of the same kind.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = MichelsonParser()
+        cls.parser = FastMichelsonParser()
+
+    def assertSameResult(self, code):
+        self.assertEqual(parse(self.reference, code), parse(self.parser, code), code)
+
+    def test_contracts(self):
+        paths = glob(join(contracts_dir, '*.tz'))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(path), open(path) as f:
+                self.assertSameResult(f.read())
+
+    def test_snippets(self):
+        for code in snippets:
+            self.assertSameResult(code)
+
+    def test_random_tokens(self):
+        rnd = Random(1)
+        for _ in range(30000):
+            separator = rnd.choice([' ', ''])
+            self.assertSameResult(separator.join(rnd.choice(token_pool) for _ in range(rnd.randint(0, 12))))
+
+    def test_error_position(self):
+        with self.assertRaisesRegex(MichelsonParserError, 'line 2, column 5'):
+            self.parser.parse('{ DUP ;\n    ) }')
@@ -0,0 +1,76 @@
+import json
+from os.path import dirname, join
+from random import Random
+from unittest import TestCase
+
+from pytezos.encoding import base58_encode
+from pytezos.michelson.forge import forge_micheline, unforge_micheline, forge_script, unforge_script, prim_tags, \
+    reserved_entries
+from pytezos.operation.forge import forge_operation_group, unforge_operation_group
+
+
+def random_micheline(rnd: Random, depth=0):
+    """
+    Generate random (not necessarily well-typed) Micheline expression.
+    """
+    r = rnd.random()
+    if depth > 4 or r < 0.3:
+        literal = rnd.choice(['int', 'string', 'bytes'])
+        if literal == 'int':
+            bound = 10 ** 30 if rnd.random() < 0.5 else 100
+            return {'int': str(rnd.randint(-bound, bound))}
+        if literal == 'string':
+            return {'string': rnd.choice(['', 'abc', 'héllo', 'x' * 300])}
+        return {'bytes': bytes(rnd.randrange(256) for _ in range(rnd.randint(0, 40))).hex()}
+    if r < 0.45:
+        return [random_micheline(rnd, depth + 1) for _ in range(rnd.randint(0, 4))]
+
+    res = {'prim': rnd.choice(list(prim_tags))}
+    args_count = rnd.randint(0, 3)
+    if args_count:
+        res['args'] = [random_micheline(rnd, depth + 1) for _ in range(args_count)]
+    if rnd.random() < 0.3:
+        res['annots'] = rnd.sample(['%a', ':t', '@v', '%long_name'], rnd.randint(1, 3))
+    return res
+
+
+class TestUnforge(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(join(dirname(__file__), 'data', 'forge_operations.json')) as f:
+            cls.operations = [case['operation'] for case in json.load(f)]
+
+    def test_micheline_round_trip(self):
+        rnd = Random(1)
+        for _ in range(5000):
+            expr = random_micheline(rnd)
+            self.assertEqual(expr, unforge_micheline(forge_micheline(expr)))
+
+    def test_script_round_trip(self):
+        rnd = Random(2)
+        for _ in range(100):
+            script = {'code': [random_micheline(rnd) for _ in range(3)], 'storage': random_micheline(rnd)}
+            self.assertEqual(script, unforge_script(forge_script(script)))
+
+    def test_operation_group_round_trip(self):
+        for operation in self.operations:
+            with self.subTest(operation['contents'][0]['kind']):
+                self.assertEqual(operation, unforge_operation_group(forge_operation_group(operation)))
+
+    def test_signed_operation_group(self):
+        signature = base58_encode(bytes(range(64)), b'sig').decode()
+        for operation in self.operations:
+            with self.subTest(operation['contents'][0]['kind']):
+                data = forge_operation_group(operation) + bytes(range(64))
+                self.assertEqual({**operation, 'signature': signature}, unforge_operation_group(data, signed=True))
+
+    def test_entrypoints(self):
+        content = next(content
+                       for operation in self.operations
+                       for content in operation['contents'] if 'parameters' in content)
+        for entrypoint in [*reserved_entries, 'demand', 'x' * 31]:
+            with self.subTest(entrypoint):
+                data = {'branch': self.operations[0]['branch'],
+                        'contents': [{**content, 'parameters': {'entrypoint': entrypoint, 'value': {'prim': 'Unit'}}}]}
+                self.assertEqual(data, unforge_operation_group(forge_operation_group(data)))